@@ -0,0 +1,152 @@
+# auth.py
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db, AsyncSessionLocal
+from models import UserDB
+from statuses import UserStatus
+from ttl_cache import TTLCache
+
+load_dotenv()
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+if not AUTH_SECRET_KEY:
+    AUTH_SECRET_KEY = secrets.token_urlsafe(32)
+    print("⚠ AUTH_SECRET_KEY not set — tokens will not survive a restart or work across workers")
+
+TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(7 * 24 * 3600)))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")  # static bearer for scrapers/ops on staff-only endpoints
+
+STAFF_ROLES = ("secretary", "captain")  # only seeded or set by staff (PUT /users/{id}); never self-chosen
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+# ---------------- Principal ----------------
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, without photo or password."""
+    id: int
+    first_name: str
+    middle_name: Optional[str]
+    last_name: str
+    contact: str
+    role: str
+    status: Optional[str]
+
+
+def is_staff(principal: Principal) -> bool:
+    """An approved secretary or captain."""
+    return principal.role in STAFF_ROLES and principal.status == UserStatus.APPROVED.label
+
+
+PRINCIPAL_COLUMNS = (
+    UserDB.id, UserDB.first_name, UserDB.middle_name, UserDB.last_name,
+    UserDB.contact, UserDB.role, UserDB.status,
+)
+
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int):
+    """Drop a cached principal; call after the user row changes or is deleted."""
+    principal_cache.delete(user_id)
+
+
+# ---------------- Tokens ----------------
+def _sign(payload: str) -> str:
+    digest = hmac.new(AUTH_SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def issue_token(user_id: int) -> str:
+    """Signed `<user_id>.<expires>.<signature>` token; verified without a DB lookup."""
+    payload = f"{user_id}.{int(time.time()) + TOKEN_TTL_SECONDS}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token: str) -> Optional[int]:
+    """Return the user id of a valid, unexpired token, else None."""
+    try:
+        user_id, expires, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(f"{user_id}.{expires}")):
+            return None
+        if int(expires) < time.time():
+            return None
+        return int(user_id)
+    except ValueError:
+        return None
+
+
+# ---------------- Dependency ----------------
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Principal from the cache, falling back to a narrow users lookup."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    row = (await db.execute(select(*PRINCIPAL_COLUMNS).where(UserDB.id == user_id))).first()
+    if row is None:
+        return None
+    principal = Principal(**row._asdict())
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Resolve the bearer token to the current user, raise 401 otherwise."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+    user_id = verify_token(credentials.credentials)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+
+    principal = await load_principal(db, user_id)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="User no longer exists", headers={"WWW-Authenticate": "Bearer"})
+    return principal
+
+
+async def require_staff(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Optional[Principal]:
+    """
+    Staff-only endpoints: an approved secretary/captain token, or
+    INTERNAL_API_TOKEN (returns None then — there is no user behind it).
+    401/403 otherwise.
+    """
+    if credentials is not None and INTERNAL_API_TOKEN and hmac.compare_digest(
+        credentials.credentials.encode(), INTERNAL_API_TOKEN.encode()
+    ):
+        return None
+    principal = await get_current_user(credentials, db)
+    if not is_staff(principal):
+        raise HTTPException(status_code=403, detail="Staff only")
+    return principal
+
+
+async def principal_from_token(token: Optional[str]) -> Optional[Principal]:
+    """Resolve a token with a short-lived session (for streams that outlive a request)."""
+    user_id = verify_token(token) if token else None
+    if user_id is None:
+        return None
+    async with AsyncSessionLocal() as db:
+        return await load_principal(db, user_id)
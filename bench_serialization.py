@@ -0,0 +1,122 @@
+"""
+Per-row cost of the GET /document-requests/ response paths.
+
+    python bench_serialization.py                    # against the current data
+    python bench_serialization.py --seed 2000 --rows 1000
+
+Paths (all fields, users joined):
+  legacy   document_request_response() per row, then validated again against the response model
+  models   DocumentRequestListItem per row, validated once and dumped by Pydantic (default path)
+  fast     column tuples mapped to dicts and encoded with orjson (FAST_JSON_RESPONSES=1)
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from database import engine
+from fast_json import dumps
+from models import DocumentRequestDB
+from projection import project, project_rows
+from routes.document_requests import (
+    REQUEST_FIELDS, REQUEST_ROW_GETTERS, document_request_response, list_requests_stmt, list_rows_stmt,
+)
+from schemas import DocumentRequestListItem, DocumentRequestPage, DocumentRequestResponse
+import migrations
+
+SORT = (DocumentRequestDB.created_at, DocumentRequestDB.id)
+ALL_FIELDS = list(REQUEST_FIELDS)
+
+
+def best_of(repeat: int, fn) -> float:
+    """Fastest of `repeat` runs, in seconds (least disturbed by GC and other processes)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# ---------------- Paths: (load rows, serialize rows) ----------------
+def first_page(stmt, rows: int):
+    return stmt.order_by(*(column.desc() for column in SORT)).limit(rows)
+
+
+def load_orm(session: Session, rows: int):
+    return session.scalars(first_page(list_requests_stmt(ALL_FIELDS), rows)).all()
+
+
+def load_tuples(session: Session, rows: int):
+    return session.execute(first_page(list_rows_stmt(ALL_FIELDS), rows)).all()
+
+
+legacy_adapter = TypeAdapter(List[DocumentRequestResponse])
+page_adapter = TypeAdapter(DocumentRequestPage)
+
+
+def serialize_legacy(rows) -> bytes:
+    responses = [document_request_response(r) for r in rows]
+    return legacy_adapter.dump_json(legacy_adapter.validate_python(responses, from_attributes=True), by_alias=True)
+
+
+def serialize_models(rows) -> bytes:
+    page = DocumentRequestPage(items=[DocumentRequestListItem(**project(r, REQUEST_FIELDS, ALL_FIELDS)) for r in rows])
+    return page_adapter.dump_json(page_adapter.validate_python(page, from_attributes=True), by_alias=True, exclude_unset=True)
+
+
+def serialize_fast(rows) -> bytes:
+    return dumps({"items": project_rows(rows, REQUEST_ROW_GETTERS, ALL_FIELDS), "next_cursor": None})
+
+
+PATHS = {
+    "legacy": (load_orm, serialize_legacy),
+    "models": (load_orm, serialize_models),
+    "fast": (load_tuples, serialize_fast),
+}
+
+
+def run(rows: int, repeat: int) -> dict:
+    report = {}
+    with Session(engine) as session:
+        for name, (load, serialize) in PATHS.items():
+            loaded = load(session, rows)
+            count = len(loaded) or 1
+            load_s = best_of(repeat, lambda: (load(session, rows), session.expunge_all()))
+            serialize_s = best_of(repeat, lambda: serialize(loaded))
+            report[name] = {
+                "rows": len(loaded),
+                "load_us_per_row": round(load_s / count * 1e6, 2),
+                "serialize_us_per_row": round(serialize_s / count * 1e6, 2),
+                "total_us_per_row": round((load_s + serialize_s) / count * 1e6, 2),
+                "bytes": len(serialize(loaded)),
+            }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization paths.")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per response (one page)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="add this many synthetic residents first")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine, verbose=False)
+    if args.seed:
+        from synthetic import generate
+        generate(engine, args.seed, photo_pool_size=0)
+
+    report = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        baseline = report["legacy"]["total_us_per_row"]
+        print(f"{'path':<8} {'rows':>6} {'load µs/row':>12} {'serialize µs/row':>17} {'total µs/row':>13} {'speedup':>8}")
+        for name, r in report.items():
+            speedup = baseline / r["total_us_per_row"] if r["total_us_per_row"] else 0
+            print(f"{name:<8} {r['rows']:>6} {r['load_us_per_row']:>12} {r['serialize_us_per_row']:>17} "
+                  f"{r['total_us_per_row']:>13} {speedup:>7.1f}x")
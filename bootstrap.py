@@ -0,0 +1,113 @@
+# bootstrap.py
+"""
+One-time boot work: schema migrations and the seeded admin accounts.
+
+BOOT_MODE=migrate (default) does it in the app's startup hook. Every worker
+first checks, without locking, whether anything is left to do; only then does
+it take the migration advisory lock, so with `uvicorn --workers N` one worker
+does the work, the others wait for it and find nothing left.
+
+BOOT_MODE=check leaves it to a deploy step run once before the workers start:
+
+    python bootstrap.py
+
+Workers then only check the schema version and report not-ready on /ready
+until the deploy step has brought it up to date.
+"""
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import SessionLocal, async_engine, engine
+import migrations
+from seed_admins import missing_admin_roles, seed_admins
+
+load_dotenv()
+BOOT_MODE = os.getenv("BOOT_MODE", "migrate")  # migrate | check
+if BOOT_MODE not in ("migrate", "check"):
+    raise ValueError(f"Unknown BOOT_MODE: {BOOT_MODE}")
+LOG_ROUTES = os.getenv("LOG_ROUTES", "0") == "1"  # print the route table at startup
+
+
+def outstanding() -> tuple:
+    """(pending migration versions, missing admin roles), read without any lock."""
+    with engine.connect() as conn:
+        pending = migrations.pending_versions(conn)
+    if pending:
+        return pending, []  # users may not even have its current columns yet
+    with SessionLocal() as db:
+        return pending, missing_admin_roles(db)
+
+
+def bootstrap(verbose: bool = True) -> bool:
+    """Migrate and seed under the advisory lock if needed; returns whether anything was left to do."""
+    pending, missing = outstanding()
+    if not pending and not missing:
+        return False
+    with migrations.migration_lock(engine):
+        # Another worker may have finished while this one waited for the lock;
+        # upgrade and seed_admins re-check, so they do nothing in that case
+        migrations.upgrade(engine, verbose=verbose, lock=False)
+        seed_admins()
+    return True
+
+
+# ---------------- Readiness (/ready) ----------------
+class Readiness:
+    """Ready once startup has finished and the schema is current; not ready again once shutdown begins."""
+
+    def __init__(self):
+        self.started = False
+        self.stopping = False
+        self.schema_current = False
+        self.boot_seconds = None
+        self._imported_at = time.perf_counter()
+
+    def mark_started(self):
+        """Call after the last startup hook; boot time counts from importing the app."""
+        self.started = True
+        self.boot_seconds = round(time.perf_counter() - self._imported_at, 3)
+
+    async def check(self) -> dict:
+        problems = []
+        if not self.started:
+            problems.append("starting")
+        if self.stopping:
+            problems.append("shutting down")
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                if not self.schema_current:
+                    # BOOT_MODE=check: wait for the deploy step, then stop asking
+                    pending = await conn.run_sync(migrations.pending_versions)
+                    self.schema_current = not pending
+                    if pending:
+                        problems.append(f"pending migrations {pending}")
+        except Exception as e:
+            problems.append(f"database unavailable: {e.__class__.__name__}")
+        return {"ready": not problems, "problems": problems, "boot_seconds": self.boot_seconds}
+
+
+readiness = Readiness()
+
+
+def startup():
+    """Boot work for one worker; called from the app's startup hook."""
+    if BOOT_MODE == "migrate":
+        bootstrap()
+        readiness.schema_current = True
+        return
+    pending, _ = outstanding()
+    readiness.schema_current = not pending
+    if pending:
+        print(f"⚠ Schema is behind (pending migrations {pending}); run `python bootstrap.py`")
+
+
+# --- Run directly (deploy step for BOOT_MODE=check) ---
+if __name__ == "__main__":
+    if bootstrap():
+        print("🎉 Schema migrated and admins seeded.")
+    else:
+        print("✅ Nothing to do: schema up to date and admins present.")
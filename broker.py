@@ -0,0 +1,128 @@
+# broker.py
+import asyncio
+import json
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Set
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+from models import NotificationDB
+
+load_dotenv()
+NOTIFY_BACKEND = os.getenv("NOTIFY_BACKEND", "memory")  # memory | postgres
+NOTIFY_CHANNEL = "notifications"
+SUBSCRIBER_QUEUE_SIZE = 100
+PG_NOTIFY_MAX_BYTES = 7900  # Postgres caps NOTIFY payloads at 8000 bytes
+
+ALL = "all"  # topic for staff dashboards: every notification
+
+
+def notification_message(notif: NotificationDB) -> dict:
+    """JSON-safe payload pushed to subscribers (same keys as NotificationResponse)."""
+    return {
+        "id": notif.id,
+        "title": notif.title,
+        "message": notif.message,
+        "type": notif.type,
+        "is_read": bool(notif.is_read),
+        "created_at": notif.created_at.isoformat() if notif.created_at else None,
+        "user_id": notif.user_id,
+    }
+
+
+# ---------------- In-process broker ----------------
+class InProcessBroker:
+    """Fans notifications out to the subscribers of this worker."""
+
+    def __init__(self):
+        self._subscribers: Dict[object, Set[asyncio.Queue]] = defaultdict(set)
+
+    @asynccontextmanager
+    async def subscribe(self, topic):
+        """Yield a queue receiving messages for `topic` (a user id or ALL)."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[topic].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[topic].discard(queue)
+            if not self._subscribers[topic]:
+                del self._subscribers[topic]
+
+    def dispatch(self, message: dict):
+        """Deliver to local subscribers; a slow subscriber drops messages rather than blocking."""
+        for topic in (message.get("user_id"), ALL):
+            for queue in list(self._subscribers.get(topic, ())):
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    pass
+
+    async def publish(self, messages):
+        """Publish committed notifications (called by the outbox dispatcher)."""
+        for message in messages:
+            self.dispatch(message)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+# ---------------- Postgres LISTEN/NOTIFY broker ----------------
+class PostgresBroker(InProcessBroker):
+    """
+    Publishes with pg_notify(), so every worker's LISTEN connection (this one
+    included) receives the message and fans it out to its own subscribers.
+    """
+
+    def __init__(self, database_url: str):
+        super().__init__()
+        url = make_url(database_url).set(drivername="postgresql")
+        self._dsn = url.render_as_string(hide_password=False)
+        self._conn = None
+
+    async def publish(self, messages):
+        for message in messages:
+            payload = json.dumps(message)
+            if len(payload.encode()) > PG_NOTIFY_MAX_BYTES:
+                payload = json.dumps({"id": message["id"], "user_id": message["user_id"], "truncated": True})
+            await self._conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.dispatch(json.loads(payload))
+        except ValueError:
+            print(f"⚠ Ignoring malformed notification payload: {payload[:100]}")
+
+    async def start(self):
+        import asyncpg  # only needed for this backend
+
+        self._conn = await asyncpg.connect(self._dsn)
+        await self._conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+
+    async def stop(self):
+        if self._conn is not None:
+            await self._conn.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            await self._conn.close()
+            self._conn = None
+
+
+def create_broker() -> InProcessBroker:
+    if NOTIFY_BACKEND == "postgres":
+        from database import ASYNC_DATABASE_URL
+        return PostgresBroker(ASYNC_DATABASE_URL)
+    if NOTIFY_BACKEND != "memory":
+        raise ValueError(f"Unknown NOTIFY_BACKEND: {NOTIFY_BACKEND}")
+    return InProcessBroker()
+
+
+broker = create_broker()
+
@@ -0,0 +1,238 @@
+"""
+Fail if the migrations cannot bring a database up to the models.
+
+    python check_migrations.py                                   # SQLite, temporary files
+    python check_migrations.py --url postgresql://…/scratch_db   # an empty scratch database
+
+Two runs, each from an empty database:
+  - fresh: migrations.upgrade() on nothing;
+  - legacy: the schema (and a few rows) the app created with create_all before
+    versioned migrations existed, then migrations.upgrade().
+
+Both must end with every table, column and index the models declare,
+re-running every migration must be a no-op, and the legacy rows must come
+through the data migrations (status codes, counters, name keys) while new
+rows written through the models still get their defaults.
+Everything in the --url database is dropped, so never point it at real data.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, create_engine, func, insert,
+    inspect, text,
+)
+
+# ---------------- The pre-migration schema ----------------
+# What Base.metadata.create_all built before migrations/ existed; frozen, like the migrations.
+legacy = MetaData()
+Table(
+    "users", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("first_name", String, nullable=False),
+    Column("middle_name", String, nullable=True),
+    Column("last_name", String, nullable=False),
+    Column("dob", DateTime, nullable=False),
+    Column("gender", String, nullable=False),
+    Column("civil_status", String, nullable=False),
+    Column("contact", String, unique=True, index=True, nullable=False),
+    Column("purok", String, nullable=False),
+    Column("barangay", String, nullable=False),
+    Column("city", String, nullable=False),
+    Column("province", String, nullable=False),
+    Column("postal_code", String, nullable=False),
+    Column("password", String, nullable=False),
+    Column("photo", Text, nullable=False),
+    Column("role", String, nullable=False),
+    Column("status", String),
+)
+Table(
+    "document_requests", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("document_type", String, nullable=False),
+    Column("purpose", String, nullable=False),
+    Column("copies", Integer, nullable=False),
+    Column("requirements", Text),
+    Column("photo", Text, nullable=True),
+    Column("status", String),
+    Column("action", String),
+    Column("notes", Text),
+    Column("contact", String, nullable=False, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("pickup_date", DateTime(timezone=True), nullable=True),
+    Column("is_deleted", Boolean, nullable=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+)
+Table(
+    "notifications", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("type", String(50)),
+    Column("is_read", Boolean),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+)
+
+
+def create_legacy(engine):
+    """The pre-migration tables with one approved resident, a pending request and a notification."""
+    legacy.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(legacy.tables["users"]).values(
+            id=1, first_name="Juan", middle_name=None, last_name="Dela  Cruz", dob=datetime(1990, 1, 1),
+            gender="Male", civil_status="Single", contact="09171234567", purok="Purok 1", barangay="San Isidro",
+            city="City", province="Province", postal_code="0000", password="x", photo="aGVsbG8=",
+            role="resident", status="Approved",
+        ))
+        conn.execute(insert(legacy.tables["document_requests"]).values(
+            id=1, document_type="Barangay Clearance", purpose="Employment", copies=1, requirements="",
+            status="pending", action="Review", notes="", contact="09171234567", user_id=1, is_deleted=False,
+        ))
+        conn.execute(insert(legacy.tables["notifications"]).values(
+            id=1, title="Welcome", message="Hello", type="info", is_read=False, created_at=now, user_id=1,
+        ))
+
+
+# ---------------- Checks ----------------
+def drop_everything(engine):
+    meta = MetaData()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # SQLite cannot reflect expression indexes; dropping the table drops them
+        meta.reflect(engine)
+    meta.drop_all(engine)
+
+
+def index_names(engine, inspector, table: str) -> set:
+    if engine.dialect.name == "sqlite":  # the inspector skips expression indexes there
+        with engine.connect() as conn:
+            return set(conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {"table": table}
+            ).scalars())
+    return {i["name"] for i in inspector.get_indexes(table)}
+
+
+def schema_problems(engine, metadata) -> list:
+    """Tables, columns and indexes the models declare that the database lacks, and column constraint drift."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    problems = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            problems.append(f"missing table {table.name}")
+            continue
+        columns = {c["name"]: c for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            found = columns.get(column.name)
+            if found is None:
+                problems.append(f"missing column {table.name}.{column.name}")
+                continue
+            if not column.primary_key and found["nullable"] != column.nullable:
+                problems.append(f"{table.name}.{column.name} is {'' if found['nullable'] else 'NOT '}NULL in the database")
+            if column.server_default is not None and found["default"] is None:
+                problems.append(f"{table.name}.{column.name} has no server default in the database")
+        indexes = index_names(engine, inspector, table.name)
+        problems += [f"missing index {i.name} on {table.name}" for i in table.indexes if i.name not in indexes]
+    return problems
+
+
+def data_problems(engine) -> list:
+    """The legacy rows after the data migrations."""
+    with engine.connect() as conn:
+        user = conn.execute(text("SELECT status, name_key, updated_at FROM users WHERE id = 1")).one()
+        request_status = conn.execute(text("SELECT status FROM document_requests WHERE id = 1")).scalar()
+        counters = conn.execute(text("SELECT status, document_type, count FROM request_counters")).all()
+        notification_updated = conn.execute(text("SELECT updated_at FROM notifications WHERE id = 1")).scalar()
+        transitions = conn.execute(text("SELECT count(*) FROM request_status_transitions")).scalar()
+    expected = [
+        ("users.status", int(user.status), 2),  # Approved
+        ("users.name_key", user.name_key, "juan\x1fdela cruz"),
+        ("users.updated_at set", user.updated_at is not None, True),
+        ("document_requests.status", int(request_status), 1),  # Pending
+        ("request_counters", [(int(s), d, n) for s, d, n in counters], [(1, "Barangay Clearance", 1)]),
+        ("notifications.updated_at set", notification_updated is not None, True),
+        ("request_status_transitions rows", transitions, 7),
+    ]
+    return [f"{name}: got {got!r}, expected {want!r}" for name, got, want in expected if got != want]
+
+
+def write_problems(engine) -> list:
+    """Rows written through the models get their defaults (SQLite cannot ALTER in a server default)."""
+    from sqlalchemy.orm import Session
+    from models import NotificationDB, UserDB
+
+    with Session(engine) as db:
+        user = UserDB(
+            first_name="Maria", last_name="Santos", dob=datetime(1990, 1, 1), gender="Female",
+            civil_status="Single", contact="09179999999", purok="Purok 2", barangay="San Isidro", city="City",
+            province="Province", postal_code="0000", password="x", role="resident", status="Pending",
+        )
+        db.add(user)
+        db.flush()
+        db.add(NotificationDB(user_id=user.id, title="Hi", message="Hello"))
+        db.commit()
+        user_id = user.id
+    with engine.connect() as conn:
+        user_updated = conn.execute(text("SELECT updated_at FROM users WHERE id = :id"), {"id": user_id}).scalar()
+        notification_updated = conn.execute(
+            text("SELECT updated_at FROM notifications WHERE user_id = :id"), {"id": user_id}
+        ).scalar()
+    return [f"{name} is NULL after an ORM insert" for name, value in
+            (("users.updated_at", user_updated), ("notifications.updated_at", notification_updated)) if value is None]
+
+
+def run(engine, scenario: str) -> list:
+    import migrations
+    from models import Base  # importing models registers every table on Base.metadata
+
+    drop_everything(engine)
+    if scenario == "legacy":
+        create_legacy(engine)
+    migrations.upgrade(engine, verbose=False)
+
+    problems = schema_problems(engine, Base.metadata)
+    if migrations.upgrade(engine, verbose=False):
+        problems.append("a second upgrade applied migrations again")
+    for version, description, module in migrations.available():
+        try:
+            with engine.begin() as conn:
+                module.upgrade(conn)
+        except Exception as e:
+            problems.append(f"{version:04d} is not idempotent: {e.__class__.__name__}: {e}")
+    if scenario == "legacy":
+        problems += data_problems(engine)
+    return problems + write_problems(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if migrations cannot upgrade a fresh or a legacy database.")
+    parser.add_argument("--url", help="an empty scratch database (everything in it is dropped); default: SQLite")
+    args = parser.parse_args()
+
+    scratch = None
+    if args.url is None:
+        scratch = tempfile.TemporaryDirectory()
+        args.url = f"sqlite:///{os.path.join(scratch.name, 'migrations.db')}"
+    os.environ.setdefault("DATABASE_URL", args.url)  # models import database, which needs one
+
+    engine = create_engine(args.url)
+    failures = 0
+    for scenario in ("fresh", "legacy"):
+        try:
+            problems = run(engine, scenario)
+        except Exception as e:
+            problems = [f"upgrade failed: {e.__class__.__name__}: {e}"]
+        print(f"{'❌' if problems else '✅'} {scenario} database")
+        for problem in problems:
+            print(f"   {problem}")
+        failures += bool(problems)
+    engine.dispose()
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,137 @@
+"""
+Fail if a hot route query falls back to a sequential scan.
+
+    python check_query_plans.py            # EXPLAIN against the current data
+    python check_query_plans.py --seed 20000
+
+Plans depend on table size and statistics, so run it on a seeded dataset
+(--seed adds synthetic residents, requests and notifications, see synthetic.py).
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import select, text
+
+from database import engine
+from models import UserDB, DocumentRequestDB, NotificationDB
+from pagination import page_stmt, encode_cursor, DEFAULT_PAGE_SIZE
+from routes.document_requests import list_requests_stmt, list_state_stmt, REQUEST_FIELDS
+from routes.notifications import archived_since_stmt, inbox_stmt, unread_count_stmt
+from routes.users import search_stmt, user_filters
+from sync import changes_stmt
+from synthetic import generate
+import migrations
+
+HOT_TABLES = {"users", "document_requests", "notifications"}
+
+
+# ---------------- Plans ----------------
+def explain(conn, stmt) -> list:
+    """Sequential scans on hot tables in the plan of `stmt` (empty list = OK)."""
+    compiled = stmt.compile(dialect=conn.dialect)
+
+    def bound(name):
+        # run the column type's bind processor (e.g. StatusCode label -> smallint)
+        processor = compiled.binds[name].type.bind_processor(conn.dialect)
+        value = compiled.params[name]
+        return processor(value) if processor else value
+
+    if compiled.positiontup:
+        params = tuple(bound(name) for name in compiled.positiontup)
+    else:
+        params = {name: bound(name) for name in compiled.params}
+
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans, nodes = [], [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in HOT_TABLES:
+                scans.append(f"Seq Scan on {node['Relation Name']}")
+            nodes.extend(node.get("Plans", []))
+        return scans
+
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        words = detail.split()
+        if words[:1] == ["SCAN"] and words[1] in HOT_TABLES and "USING" not in words:
+            scans.append(detail)
+    return scans
+
+
+def hot_queries(conn) -> dict:
+    """The statements the hot routes run, with realistic parameter values."""
+    user_count = conn.execute(text("SELECT count(*) FROM users")).scalar()
+    user_id, contact, barangay, purok, key = conn.execute(
+        select(UserDB.id, UserDB.contact, UserDB.barangay, UserDB.purok, UserDB.name_key)
+        .order_by(UserDB.id).offset(user_count // 2).limit(1)
+    ).one()
+    middle = conn.execute(
+        select(DocumentRequestDB.created_at, DocumentRequestDB.id)
+        .order_by(DocumentRequestDB.created_at.desc()).offset(1000).limit(1)
+    ).first()
+    cursor = encode_cursor(*middle) if middle else None
+    recent = conn.execute(
+        select(DocumentRequestDB.updated_at, DocumentRequestDB.id)
+        .order_by(DocumentRequestDB.updated_at.desc()).offset(100).limit(1)
+    ).first()
+    since = encode_cursor(*recent) if recent else None
+
+    fields = list(REQUEST_FIELDS)
+    sort = (DocumentRequestDB.created_at, DocumentRequestDB.id)
+    queries = {
+        "GET /document-requests/ (page 1)": page_stmt(list_requests_stmt(fields), *sort, None, DEFAULT_PAGE_SIZE),
+        "GET /document-requests/ (deep cursor)": page_stmt(list_requests_stmt(fields), *sort, cursor, DEFAULT_PAGE_SIZE),
+        "GET /document-requests/?contact=": page_stmt(list_requests_stmt(fields, contact=contact), *sort, None, DEFAULT_PAGE_SIZE),
+        "GET /document-requests/?status=": page_stmt(list_requests_stmt(fields, status="approved"), *sort, None, DEFAULT_PAGE_SIZE),
+        "GET /document-requests/ (ETag, deep cursor)": list_state_stmt(cursor=cursor),
+        "GET /document-requests/?status= (ETag)": list_state_stmt(status="approved"),
+        "GET /notifications/users/{id}": page_stmt(
+            inbox_stmt(user_id), NotificationDB.created_at, NotificationDB.id, None, DEFAULT_PAGE_SIZE),
+        "GET /notifications/users/{id}?is_read=false": page_stmt(
+            inbox_stmt(user_id, False), NotificationDB.created_at, NotificationDB.id, None, DEFAULT_PAGE_SIZE),
+        "GET /notifications/users/{id}/unread-count": unread_count_stmt(user_id),
+        "GET /document-requests/changes?since=": changes_stmt(
+            select(DocumentRequestDB), DocumentRequestDB.updated_at, DocumentRequestDB.id, since, DEFAULT_PAGE_SIZE),
+        "GET /notifications/users/{id}/changes": changes_stmt(
+            select(NotificationDB).where(NotificationDB.user_id == user_id),
+            NotificationDB.updated_at, NotificationDB.id, None, DEFAULT_PAGE_SIZE),
+        "GET /notifications/users/{id}/changes (removed)": archived_since_stmt(user_id, datetime.utcnow()),
+        "POST /users/login": select(UserDB).where(UserDB.contact == contact),
+        "GET /users/pending": page_stmt(
+            select(UserDB).where(*user_filters(status="Pending", role="resident")), UserDB.id, UserDB.id, None, DEFAULT_PAGE_SIZE),
+        "GET /users/?barangay=&purok=": page_stmt(
+            select(UserDB).where(*user_filters(barangay=barangay, purok=purok)), UserDB.id, UserDB.id, None, DEFAULT_PAGE_SIZE),
+        "POST /users/ (duplicate name)": select(UserDB.id).where(UserDB.name_key == key),
+    }
+    if conn.dialect.name == "postgresql":  # SQLite has no trigram index, search scans there
+        search = search_stmt(key.split()[-1][:5], conn.dialect.name)
+        queries["GET /users/search?q="] = page_stmt(search, search.selected_columns.rank, UserDB.id, None, DEFAULT_PAGE_SIZE)
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query plan uses a sequential scan.")
+    parser.add_argument("--seed", type=int, default=0, help="add this many synthetic residents first")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine, verbose=False)
+    if args.seed:
+        generate(engine, args.seed, photo_pool_size=0)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    failures = 0
+    with engine.connect() as conn:
+        for name, stmt in hot_queries(conn).items():
+            scans = explain(conn, stmt)
+            print(f"{'❌' if scans else '✅'} {name}" + (f" — {'; '.join(scans)}" if scans else ""))
+            failures += bool(scans)
+
+    sys.exit(1 if failures else 0)
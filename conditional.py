@@ -0,0 +1,83 @@
+# conditional.py
+"""
+HTTP conditional GET: validators come from updated_at (plus a row count, or
+the page's own (id, updated_at) keys, for collections) so a revalidation
+costs one indexed query and no serialization.
+
+Only single rows get Last-Modified. A collection's max(updated_at) does not
+move when a row leaves it (a status change out of a ?status= filter, a
+delete), so If-Modified-Since would answer 304 on a changed list;
+collections revalidate with their ETag, which sees such a row go.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime truncated to seconds (HTTP-date precision); naive values are UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_validators(route: str, params: Iterable[Tuple[str, str]], *state, last_modified: Optional[datetime] = None) -> Validators:
+    """
+    Weak ETag over the route, its query params (filters, fields, cursor) and
+    `state` — e.g. (row count, max(updated_at)) — plus Last-Modified (single rows only).
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(params))
+    raw = "|".join([route, query, *(str(part) for part in state)])
+    return Validators(
+        etag=f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"',
+        last_modified=_utc(last_modified),
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))  # weak comparison
+
+
+def not_modified(request: Request, validators: Validators) -> Optional[Response]:
+    """A 304 response if the client's copy is current, else None (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, validators.etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since or validators.last_modified is None:
+            return None
+        try:
+            fresh = validators.last_modified <= _utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return None
+    return Response(status_code=304, headers=validators.headers()) if fresh else None
+
+
+def with_validators(response: Response, validators: Validators) -> Response:
+    response.headers.update(validators.headers())
+    return response
@@ -0,0 +1,146 @@
+# counters.py
+import asyncio
+import os
+import traceback
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import AsyncSessionLocal
+from models import DocumentRequestDB, RequestCounterDB
+
+load_dotenv()
+COUNTER_RECONCILE_SECONDS = float(os.getenv("COUNTER_RECONCILE_SECONDS", "3600"))  # 0 = never
+
+Key = Tuple[str, str]  # (status label, document_type)
+
+
+# ---------------- Write side ----------------
+def counter_key(db_request: DocumentRequestDB) -> Optional[Key]:
+    """Bucket a request is counted in; None once it is soft deleted."""
+    if db_request.is_deleted:
+        return None
+    return (db_request.status, db_request.document_type)
+
+
+def move(deltas: Counter, old: Optional[Key], new: Optional[Key]):
+    """Record one request moving from bucket `old` to `new` (None = not counted)."""
+    if old == new:
+        return
+    if old is not None:
+        deltas[old] -= 1
+    if new is not None:
+        deltas[new] += 1
+
+
+async def apply(db, deltas: Counter):
+    """
+    Add `deltas` to request_counters in the caller's transaction (nothing is
+    committed here). Call it right before the commit: the upsert row-locks the
+    bucket, so concurrent writers to the same bucket queue behind it.
+    """
+    rows = [
+        {"status": status, "document_type": document_type, "count": n}
+        for (status, document_type), n in sorted(deltas.items())  # fixed lock order, no deadlocks
+        if n
+    ]
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    upsert = dialect_insert(RequestCounterDB)
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[RequestCounterDB.status, RequestCounterDB.document_type],
+            set_={"count": RequestCounterDB.count + upsert.excluded.count},
+        ),
+        rows,
+    )
+
+
+async def record(db, old: Optional[Key], new: Optional[Key]):
+    """Single-request shortcut for move() + apply()."""
+    deltas = Counter()
+    move(deltas, old, new)
+    await apply(db, deltas)
+
+
+# ---------------- Reconciliation ----------------
+def live_counts_stmt():
+    """The counters recomputed from document_requests (one GROUP BY)."""
+    return (
+        select(DocumentRequestDB.status, DocumentRequestDB.document_type, func.count())
+        .where(DocumentRequestDB.is_deleted == False)
+        .group_by(DocumentRequestDB.status, DocumentRequestDB.document_type)
+    )
+
+
+def rebuild_stmts():
+    return [
+        delete(RequestCounterDB),
+        insert(RequestCounterDB).from_select(["status", "document_type", "count"], live_counts_stmt()),
+    ]
+
+
+async def reconcile() -> Dict[Key, Tuple[int, int]]:
+    """
+    Recount from document_requests and rewrite request_counters if they drifted.
+    Returns {bucket: (stored, actual)} for every bucket that was wrong.
+    """
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            # Waits for in-flight writers and holds new ones off, so the recount
+            # below sees every committed change and none slips in before the rewrite
+            await db.execute(text("LOCK TABLE request_counters IN EXCLUSIVE MODE"))
+        stored = {(r.status, r.document_type): r.count for r in (await db.scalars(select(RequestCounterDB))).all()}
+        actual = {(status, document_type): n for status, document_type, n in (await db.execute(live_counts_stmt())).all()}
+
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in stored.keys() | actual.keys()
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        if drift or 0 in stored.values():
+            for stmt in rebuild_stmts():
+                await db.execute(stmt)
+        await db.commit()
+    return drift
+
+
+class CounterReconciler:
+    """Background task that runs reconcile() every `interval` seconds."""
+
+    def __init__(self, interval: float = COUNTER_RECONCILE_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                drift = await reconcile()
+                if drift:
+                    print(f"⚠ Request counters drifted, rebuilt: {drift}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                print("⚠ Counter reconciliation failed, will retry")
+                traceback.print_exc()
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+reconciler = CounterReconciler()
@@ -1,21 +1,89 @@
 # database.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from settings import DatabaseSettings, load_database_settings
+from pool_stats import PoolStats, TimedQueuePool, TimedAsyncQueuePool
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Async driver for each sync dialect (asyncpg for Postgres, aiosqlite for local runs)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in DATABASE_URL for its async counterpart."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+DB_SETTINGS = load_database_settings()
+
+
+def engine_options(url: str, settings: DatabaseSettings, **overrides) -> dict:
+    """create_engine kwargs for a settings profile, incl. the per-statement timeout."""
+    options = {
+        "echo": settings.echo,
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+    parsed = make_url(url)
+    if settings.statement_timeout_ms and parsed.get_backend_name() == "postgresql":
+        timeout = str(settings.statement_timeout_ms)
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    options.update(overrides)
+    return options
+
+
+# ✅ Sync engine: schema setup, seeding and CLI scripts (small pool)
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    **engine_options(DATABASE_URL, DB_SETTINGS, pool_size=1, max_overflow=2),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# ✅ Async engine: request handlers
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    **engine_options(ASYNC_DATABASE_URL, DB_SETTINGS),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# ✅ Pool telemetry (see GET /internal/pool-stats)
+engine.pool.stats = PoolStats()
+async_engine.sync_engine.pool.stats = PoolStats()
+
+
+def pool_stats() -> dict:
+    return {
+        "async": async_engine.sync_engine.pool.stats.snapshot(async_engine.sync_engine.pool),
+        "sync": engine.pool.stats.snapshot(engine.pool),
+    }
+
 # ✅ Database dependency (can be imported anywhere)
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,346 @@
+# delivery.py
+"""
+SMS delivery of notifications, off the request path.
+
+The outbox dispatcher queues one notification_deliveries row per resident
+notification of a DELIVERY_SMS_TYPES type (in the same transaction that
+drains the outbox entry), so handlers only ever write the notification
+itself; opting a notification into SMS means giving it one of those types.
+Staff-facing ones (registrations, resubmissions) stay in-app only. DeliveryWorker then:
+
+  1. claims a batch of due Pending rows (FOR UPDATE SKIP LOCKED on Postgres,
+     so workers split the queue) and leases it by pushing next_attempt_at
+     DELIVERY_LEASE_SECONDS ahead; a worker that dies mid-batch lets the
+     lease run out and another one picks the rows up again;
+  2. sends them through the transport, at most DELIVERY_CONCURRENCY at a
+     time and DELIVERY_RATE_PER_SECOND per provider;
+  3. records the outcome in one bulk UPDATE: Sent; Pending again after an
+     exponential backoff with jitter; or Dead (the dead letter) after a
+     permanent error or DELIVERY_MAX_ATTEMPTS tries.
+
+DELIVERY_TRANSPORT picks the provider: none (default, nothing is queued),
+fake (FakeGateway, in memory, for tests and local runs) or http (a JSON
+SMS gateway at DELIVERY_HTTP_URL). Push needs device tokens, which users do
+not have yet; a push Transport would plug in the same way.
+"""
+import asyncio
+import os
+import random
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select, update
+
+from database import AsyncSessionLocal
+from models import NotificationDB, NotificationDeliveryDB, UserDB
+from statuses import DeliveryStatus
+
+load_dotenv()
+DELIVERY_TRANSPORT = os.getenv("DELIVERY_TRANSPORT", "none")  # none | fake | http
+DELIVERY_BATCH_SIZE = int(os.getenv("DELIVERY_BATCH_SIZE", "100"))
+DELIVERY_CONCURRENCY = int(os.getenv("DELIVERY_CONCURRENCY", "10"))
+DELIVERY_RATE_PER_SECOND = float(os.getenv("DELIVERY_RATE_PER_SECOND", "20"))
+DELIVERY_MAX_ATTEMPTS = int(os.getenv("DELIVERY_MAX_ATTEMPTS", "8"))
+DELIVERY_BACKOFF_SECONDS = float(os.getenv("DELIVERY_BACKOFF_SECONDS", "5"))  # first retry; doubles each time
+DELIVERY_BACKOFF_MAX_SECONDS = float(os.getenv("DELIVERY_BACKOFF_MAX_SECONDS", "3600"))
+DELIVERY_LEASE_SECONDS = float(os.getenv("DELIVERY_LEASE_SECONDS", "300"))
+DELIVERY_POLL_SECONDS = float(os.getenv("DELIVERY_POLL_SECONDS", "2.0"))
+DELIVERY_HTTP_URL = os.getenv("DELIVERY_HTTP_URL", "")
+DELIVERY_HTTP_TOKEN = os.getenv("DELIVERY_HTTP_TOKEN", "")
+DELIVERY_FAKE_FAILURE_RATE = float(os.getenv("DELIVERY_FAKE_FAILURE_RATE", "0"))
+DELIVERY_SMS_TYPES = [t.strip() for t in os.getenv("DELIVERY_SMS_TYPES", "request_status").split(",") if t.strip()]
+
+SMS_MAX_CHARS = 459  # three concatenated segments
+
+
+# ---------------- Transports ----------------
+class TransientDeliveryError(Exception):
+    """Worth retrying later (timeouts, 429, 5xx)."""
+
+
+class PermanentDeliveryError(Exception):
+    """Retrying cannot help (invalid number, rejected content): dead-letter right away."""
+
+
+class Transport:
+    """A provider. send() returns the provider's message id or raises one of the errors above."""
+
+    name = "base"
+    channel = "sms"
+    rate_per_second = DELIVERY_RATE_PER_SECOND
+
+    async def send(self, recipient: str, text: str) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class FakeGateway(Transport):
+    """In-memory gateway: keeps what it "sent", fails a DELIVERY_FAKE_FAILURE_RATE share transiently."""
+
+    name = "fake"
+
+    def __init__(self, failure_rate: float = DELIVERY_FAKE_FAILURE_RATE, latency: float = 0.0):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.sent: List[Tuple[str, str, str]] = []  # (recipient, text, message id)
+
+    async def send(self, recipient: str, text: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not recipient.startswith("+") or not recipient[1:].isdigit():
+            raise PermanentDeliveryError(f"Invalid number: {recipient}")
+        if random.random() < self.failure_rate:
+            raise TransientDeliveryError("Simulated gateway failure")
+        message_id = uuid.uuid4().hex
+        self.sent.append((recipient, text, message_id))
+        return message_id
+
+
+class HttpGateway(Transport):
+    """POST {"to", "message"} as JSON to DELIVERY_HTTP_URL with a bearer token; expects {"id": ...} back."""
+
+    name = "http"
+
+    def __init__(self, url: str = DELIVERY_HTTP_URL, token: str = DELIVERY_HTTP_TOKEN):
+        import httpx  # only needed for this transport
+
+        if not url:
+            raise ValueError("DELIVERY_HTTP_URL is not set")
+        self._httpx = httpx
+        self._client = httpx.AsyncClient(
+            base_url=url, timeout=10, headers={"Authorization": f"Bearer {token}"} if token else {}
+        )
+
+    async def send(self, recipient: str, text: str) -> str:
+        try:
+            response = await self._client.post("", json={"to": recipient, "message": text})
+        except self._httpx.HTTPError as e:
+            raise TransientDeliveryError(f"{e.__class__.__name__}: {e}")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientDeliveryError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise PermanentDeliveryError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return str(response.json().get("id", ""))
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def create_transport() -> Optional[Transport]:
+    if DELIVERY_TRANSPORT == "none":
+        return None
+    if DELIVERY_TRANSPORT == "fake":
+        return FakeGateway()
+    if DELIVERY_TRANSPORT == "http":
+        return HttpGateway()
+    raise ValueError(f"Unknown DELIVERY_TRANSPORT: {DELIVERY_TRANSPORT}")
+
+
+class RateLimiter:
+    """Token bucket shared by all sends to one provider (burst of one second's worth)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = max(rate, 1.0)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# ---------------- Queueing (called by the outbox dispatcher) ----------------
+def to_e164(contact: str) -> str:
+    """09171234567 -> +639171234567 (contacts are stored in the normalized 09… form)."""
+    contact = (contact or "").strip()
+    return "+63" + contact[1:] if contact.startswith("0") else contact
+
+
+def render(title: str, message: str) -> str:
+    text = f"{title}: {message}"
+    return text if len(text) <= SMS_MAX_CHARS else text[:SMS_MAX_CHARS - 1] + "…"
+
+
+async def enqueue(db, notification_ids: List[int]) -> int:
+    """Queue SMS deliveries for the DELIVERY_SMS_TYPES user notifications among these, in the caller's transaction."""
+    if DELIVERY_TRANSPORT == "none" or not DELIVERY_SMS_TYPES or not notification_ids:
+        return 0
+    now = datetime.utcnow()
+    rows = (await db.execute(
+        select(NotificationDB.id, UserDB.contact)
+        .join(UserDB, UserDB.id == NotificationDB.user_id)
+        .where(NotificationDB.id.in_(notification_ids), NotificationDB.type.in_(DELIVERY_SMS_TYPES))
+    )).all()
+    if rows:
+        await db.execute(insert(NotificationDeliveryDB), [{
+            "notification_id": notification_id, "channel": "sms", "recipient": to_e164(contact),
+            "status": DeliveryStatus.PENDING, "attempts": 0, "next_attempt_at": now,
+        } for notification_id, contact in rows])
+    return len(rows)
+
+
+# ---------------- Worker ----------------
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts` (1-based): doubling, capped, with 50–100% jitter."""
+    delay = min(DELIVERY_BACKOFF_SECONDS * 2 ** (attempts - 1), DELIVERY_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class DeliveryWorker:
+    """Background task that claims due deliveries in batches and sends them through the transport."""
+
+    def __init__(self, transport: Optional[Transport], batch_size: int = DELIVERY_BATCH_SIZE,
+                 concurrency: int = DELIVERY_CONCURRENCY, poll_seconds: float = DELIVERY_POLL_SECONDS):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._slots = asyncio.Semaphore(concurrency)
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self):
+        """Skip the poll wait (called after a local commit queued deliveries)."""
+        self._wakeup.set()
+
+    async def claim(self) -> list:
+        """Lease one batch of due deliveries; returns (id, recipient, attempts, title, message) rows."""
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            rows = (await db.execute(
+                select(NotificationDeliveryDB.id, NotificationDeliveryDB.recipient, NotificationDeliveryDB.attempts,
+                       NotificationDB.title, NotificationDB.message)
+                .join(NotificationDB, NotificationDB.id == NotificationDeliveryDB.notification_id)
+                .where(NotificationDeliveryDB.status == DeliveryStatus.PENDING,
+                       NotificationDeliveryDB.next_attempt_at <= now)
+                .order_by(NotificationDeliveryDB.next_attempt_at, NotificationDeliveryDB.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True, of=NotificationDeliveryDB)  # workers split the queue
+            )).all()
+            if rows:
+                await db.execute(
+                    update(NotificationDeliveryDB)
+                    .where(NotificationDeliveryDB.id.in_([r.id for r in rows]))
+                    .values(next_attempt_at=now + timedelta(seconds=DELIVERY_LEASE_SECONDS))
+                )
+                await db.commit()
+            return rows
+
+    async def _send(self, row) -> dict:
+        """Send one delivery; returns its UPDATE values."""
+        limiter = self._limiters.get(self.transport.name)
+        if limiter is None:
+            limiter = self._limiters[self.transport.name] = RateLimiter(self.transport.rate_per_second)
+        attempts = row.attempts + 1
+        async with self._slots:
+            await limiter.acquire()
+            try:
+                message_id = await self.transport.send(row.recipient, render(row.title, row.message))
+            except PermanentDeliveryError as e:
+                return {"id": row.id, "attempts": attempts, "status": DeliveryStatus.DEAD, "last_error": str(e)[:1000]}
+            except Exception as e:  # TransientDeliveryError or anything unexpected: retry
+                error = f"{e.__class__.__name__}: {e}"[:1000]
+                if attempts >= DELIVERY_MAX_ATTEMPTS:
+                    return {"id": row.id, "attempts": attempts, "status": DeliveryStatus.DEAD, "last_error": error}
+                return {"id": row.id, "attempts": attempts, "status": DeliveryStatus.PENDING, "last_error": error,
+                        "next_attempt_at": datetime.utcnow() + timedelta(seconds=backoff(attempts))}
+        return {"id": row.id, "attempts": attempts, "status": DeliveryStatus.SENT, "last_error": None,
+                "provider_message_id": message_id, "sent_at": datetime.utcnow()}
+
+    async def deliver_once(self) -> int:
+        """Claim, send and record one batch; returns its size."""
+        rows = await self.claim()
+        if not rows:
+            return 0
+        results = await asyncio.gather(*(self._send(row) for row in rows))
+        async with AsyncSessionLocal() as db:
+            # One executemany per set of columns (bulk UPDATE by primary key)
+            by_columns = {}
+            for values in results:
+                by_columns.setdefault(tuple(sorted(values)), []).append(values)
+            for batch in by_columns.values():
+                await db.execute(update(NotificationDeliveryDB), batch)
+            await db.commit()
+        dead = sum(1 for r in results if r["status"] == DeliveryStatus.DEAD)
+        if dead:
+            print(f"⚠ {dead} notification deliveries dead-lettered")
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.deliver_once() == self.batch_size:
+                    pass  # backlog: keep sending without waiting
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                print("⚠ Notification delivery failed, will retry")
+                traceback.print_exc()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self):
+        if self._task is None and self.transport is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.transport is not None:
+            await self.transport.close()
+
+
+delivery_worker = DeliveryWorker(create_transport())
+
+
+# ---------------- Dead letters ----------------
+async def delivery_stats() -> dict:
+    """Row counts per status and the age of the oldest due Pending delivery."""
+    async with AsyncSessionLocal() as db:
+        counts = dict((await db.execute(
+            select(NotificationDeliveryDB.status, func.count()).group_by(NotificationDeliveryDB.status)
+        )).all())
+        oldest_due = await db.scalar(
+            select(func.min(NotificationDeliveryDB.next_attempt_at))
+            .where(NotificationDeliveryDB.status == DeliveryStatus.PENDING)
+        )
+    return {
+        "transport": DELIVERY_TRANSPORT,
+        "by_status": {member.label: counts.get(member.label, 0) for member in DeliveryStatus},
+        "oldest_pending_at": oldest_due,
+    }
+
+
+async def requeue_dead() -> int:
+    """Give every dead-lettered delivery a fresh set of attempts, due now."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(NotificationDeliveryDB)
+            .where(NotificationDeliveryDB.status == DeliveryStatus.DEAD)
+            .values(status=DeliveryStatus.PENDING, attempts=0, next_attempt_at=datetime.utcnow())
+        )
+        await db.commit()
+    delivery_worker.wake()
+    return result.rowcount
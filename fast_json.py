@@ -0,0 +1,21 @@
+# fast_json.py
+"""
+Opt-in fast path for large list responses (FAST_JSON_RESPONSES=1).
+
+Rows are selected as plain column tuples, mapped straight to dicts and
+encoded with orjson: no ORM objects, no Pydantic models, no second
+validation against response_model. The bytes match the regular path
+(same keys, UTC datetimes with a "Z" suffix like Pydantic).
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def dumps(content) -> bytes:
+    import orjson  # only needed for the fast path
+
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,54 @@
+"""
+Bulk resident import from the command line (same code path as POST /users/import).
+
+    python import_residents.py census.csv
+    python import_residents.py census.ndjson --status Approved --report errors.json
+    python import_residents.py census.csv --dry-run
+
+With RESPONSE_CACHE_BACKEND=memory the API workers do not see this process's
+cache invalidation; their cached user lists expire within RESPONSE_CACHE_TTL.
+"""
+import argparse
+import asyncio
+import os
+
+from database import AsyncSessionLocal
+from resident_import import IMPORT_CHUNK_SIZE, import_residents
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+async def read_chunks(path: str, size: int = 64 * 1024):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+async def main(args):
+    async with AsyncSessionLocal() as db:
+        return await import_residents(db, read_chunks(args.path), args.format, args.status, args.dry_run, args.chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import residents from a census CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--status", choices=["Pending", "Approved"], default="Pending")
+    parser.add_argument("--dry-run", action="store_true", help="validate and check duplicates only")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--report", help="write the full JSON report here")
+    args = parser.parse_args()
+    args.format = args.format or FORMATS.get(os.path.splitext(args.path)[1].lower())
+    if args.format is None:
+        parser.error("cannot tell the format from the extension, pass --format")
+
+    report = asyncio.run(main(args))
+    for error in report.errors[:20]:
+        print(f"⚠ line {error.line} ({error.contact or '?'}): {'; '.join(error.errors)}")
+    if len(report.errors) > 20:
+        print(f"  … {len(report.errors) - 20} more")
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report.model_dump_json(indent=2))
+    verb = "would be imported" if report.dry_run else "imported"
+    print(f"{'✅' if not report.failed else '⚠'} {report.imported}/{report.total} residents {verb}, {report.failed} rejected.")
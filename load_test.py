@@ -0,0 +1,495 @@
+# load_test.py
+"""
+Scripted load against every router, with per-endpoint latency percentiles
+and throughput saved as JSON so runs can be diffed between versions.
+
+    python synthetic.py --users 50000                         # dataset first
+    python load_test.py run --url http://localhost:8000 --duration 60 --concurrency 32 --out before.json
+    python load_test.py run --in-process --duration 20       # app in this process, no server needed
+    python load_test.py compare before.json after.json       # exit 1 on a p95/p99 regression
+
+Each of --concurrency virtual clients loops until --duration: it picks an
+operation by weight (OPERATIONS), sends it and records the latency under the
+route template. Samples from the first --warmup seconds are dropped. Writes
+only touch rows the harness itself created (its own residents and requests),
+except marking notifications read; --read-only skips them all. Not covered:
+GET /notifications/ (unpaginated, would dominate any run) and the
+/notifications/stream SSE endpoint (long-lived by design). GET
+/internal/pool-stats only runs with INTERNAL_API_TOKEN set (staff-only), and
+PUT /users/{id} only with LOAD_TEST_STAFF_TOKEN (an approved secretary's
+/auth/login token: the harness's own accounts are still pending).
+Notification operations act as residents the run signed in as through
+POST /auth/login, each on their own inbox.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+SYNTHETIC_PASSWORD = "synthetic"  # synthetic.SYNTHETIC_PASSWORD (not imported: no database settings needed here)
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+# ---------------- Shared state of one run ----------------
+@dataclass
+class Context:
+    rng: random.Random
+    run_id: str
+    residents: List[dict] = field(default_factory=list)  # approved synthetic residents {id, contact}
+    request_ids: List[int] = field(default_factory=list)
+    photo_paths: List[str] = field(default_factory=list)
+    search_terms: List[str] = field(default_factory=list)
+    tokens: Dict[int, str] = field(default_factory=dict)
+    own_users: List[int] = field(default_factory=list)  # registered by this run
+    own_requests: List[int] = field(default_factory=list)  # created by this run
+    returned: List[int] = field(default_factory=list)  # own requests sent back for correction
+    registrations: int = 0
+    upload: str = ""
+    internal_token: str = os.getenv("INTERNAL_API_TOKEN", "")  # /internal is staff-only
+    staff_token: str = os.getenv("LOAD_TEST_STAFF_TOKEN", "")  # PUT /users/{id} on accounts other than your own
+
+    def resident(self) -> dict:
+        return self.rng.choice(self.residents)
+
+    def signed_in(self) -> Optional[Tuple[int, dict]]:
+        """(user id, auth headers) of a resident this run logged in as, or None before the first /auth/login."""
+        if not self.tokens:
+            return None
+        user_id = self.rng.choice(list(self.tokens))
+        return user_id, {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+
+async def prepare(client: httpx.AsyncClient, rng: random.Random) -> Context:
+    """Sample ids, contacts, photos and names to drive the operations with."""
+    ctx = Context(rng=rng, run_id=f"{int(time.time()) % 100_000:05d}")
+    cursor = None
+    for _ in range(5):
+        params = {"status": "Approved", "role": "resident", "limit": 200,
+                  "fields": "id,contact,first_name,last_name,photo"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/users/", params=params)).raise_for_status().json()
+        ctx.residents += [{"id": u["id"], "contact": u["contact"]} for u in page["items"]]
+        ctx.search_terms += [u["last_name"][:4] for u in page["items"] if len(u.get("last_name") or "") >= 2]
+        ctx.photo_paths += [httpx.URL(u["photo"]).path for u in page["items"] if (u.get("photo") or "").startswith(("/", "http"))]
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+    if not ctx.residents:
+        raise SystemExit("❌ No approved residents to drive the load with; run synthetic.py first.")
+    page = (await client.get("/document-requests/", params={"limit": 200, "fields": "id"})).raise_for_status().json()
+    ctx.request_ids = [r["id"] for r in page["items"]]
+    ctx.search_terms = sorted(set(ctx.search_terms)) or ["an"]
+    ctx.photo_paths = sorted(set(ctx.photo_paths))
+    # a realistic registration upload: ~60 KB JPEG-like bytes, base64 encoded
+    ctx.upload = base64.b64encode(b"\xff\xd8\xff\xe0" + rng.randbytes(60 * 1024) + b"\xff\xd9").decode()
+    return ctx
+
+
+# ---------------- Operations ----------------
+# Each returns (route template, response) or None when it has nothing to act on yet.
+async def list_requests(c, ctx):
+    return "GET /document-requests/", await c.get("/document-requests/")
+
+
+async def list_requests_by_contact(c, ctx):
+    return "GET /document-requests/?contact=", await c.get("/document-requests/", params={"contact": ctx.resident()["contact"]})
+
+
+async def list_requests_by_status(c, ctx):
+    status = ctx.rng.choice(["Pending", "Approved", "For Pickup"])
+    return "GET /document-requests/?status=", await c.get("/document-requests/", params={"status": status})
+
+
+async def request_stats(c, ctx):
+    return "GET /document-requests/stats", await c.get("/document-requests/stats")
+
+
+async def request_changes(c, ctx):
+    return "GET /document-requests/changes", await c.get("/document-requests/changes", params={"limit": 50})
+
+
+async def list_users(c, ctx):
+    return "GET /users/", await c.get("/users/", params={"fields": "id,first_name,last_name,contact,status"})
+
+
+async def pending_users(c, ctx):
+    return "GET /users/pending", await c.get("/users/pending")
+
+
+async def search_users(c, ctx):
+    return "GET /users/search", await c.get("/users/search", params={"q": ctx.rng.choice(ctx.search_terms)})
+
+
+async def get_user(c, ctx):
+    return "GET /users/{id}", await c.get(f"/users/{ctx.resident()['id']}")
+
+
+async def user_login(c, ctx):
+    body = {"contact": ctx.resident()["contact"], "password": SYNTHETIC_PASSWORD}
+    return "POST /users/login", await c.post("/users/login", json=body)
+
+
+async def auth_login(c, ctx):
+    resident = ctx.resident()
+    response = await c.post("/auth/login", json={"contact": resident["contact"], "password": SYNTHETIC_PASSWORD})
+    if response.status_code == 200:
+        ctx.tokens[resident["id"]] = response.json()["access_token"]
+    return "POST /auth/login", response
+
+
+async def auth_me(c, ctx):
+    if not ctx.tokens:
+        return None
+    token = ctx.rng.choice(list(ctx.tokens.values()))
+    return "GET /auth/me", await c.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+async def inbox(c, ctx):
+    if (signed_in := ctx.signed_in()) is None:
+        return None
+    user_id, headers = signed_in
+    return "GET /notifications/users/{id}", await c.get(f"/notifications/users/{user_id}", headers=headers)
+
+
+async def unread_count(c, ctx):
+    if (signed_in := ctx.signed_in()) is None:
+        return None
+    user_id, headers = signed_in
+    return "GET /notifications/users/{id}/unread-count", await c.get(
+        f"/notifications/users/{user_id}/unread-count", headers=headers
+    )
+
+
+async def notification_changes(c, ctx):
+    if (signed_in := ctx.signed_in()) is None:
+        return None
+    user_id, headers = signed_in
+    return "GET /notifications/users/{id}/changes", await c.get(f"/notifications/users/{user_id}/changes", headers=headers)
+
+
+async def get_photo(c, ctx):
+    if not ctx.photo_paths:
+        return None
+    return "GET /photos/{hash}", await c.get(ctx.rng.choice(ctx.photo_paths))
+
+
+async def pool_stats(c, ctx):
+    if not ctx.internal_token:
+        return None
+    headers = {"Authorization": f"Bearer {ctx.internal_token}"}
+    return "GET /internal/pool-stats", await c.get("/internal/pool-stats", headers=headers)
+
+
+# --- writes ---
+async def register(c, ctx):
+    ctx.registrations += 1
+    n = ctx.registrations
+    body = {
+        "firstName": "Load", "lastName": f"Tester {ctx.run_id} {n}", "dob": "1990-01-01", "gender": "Female",
+        "civilStatus": "Single", "contact": f"07{ctx.run_id}{n:04d}", "purok": "Purok 1", "barangay": "San Isidro",
+        "city": "Santa Rosa", "province": "Laguna", "postalCode": "4026", "password": SYNTHETIC_PASSWORD,
+        "photo": ctx.upload, "role": "resident",
+    }
+    response = await c.post("/users/", json=body)
+    if response.status_code == 200:
+        ctx.own_users.append(response.json()["id"])
+    return "POST /users/", response
+
+
+async def update_user(c, ctx):
+    if not ctx.own_users or not ctx.staff_token:
+        return None
+    user_id = ctx.rng.choice(ctx.own_users)
+    headers = {"Authorization": f"Bearer {ctx.staff_token}"}
+    return "PUT /users/{id}", await c.put(
+        f"/users/{user_id}", json={"middle_name": ctx.rng.choice(["A", "B", "C"])}, headers=headers
+    )
+
+
+async def delete_user(c, ctx):
+    if len(ctx.own_users) < 5:  # keep a few for update_user
+        return None
+    return "DELETE /users/{id}", await c.delete(f"/users/{ctx.own_users.pop(0)}")
+
+
+async def create_request(c, ctx):
+    body = {"documentType": "Barangay Clearance", "purpose": "Employment", "copies": 1,
+            "contact": ctx.resident()["contact"], "notes": "load test"}
+    response = await c.post("/document-requests/", json=body)
+    if response.status_code == 201:
+        ctx.own_requests.append(response.json()["id"])
+    return "POST /document-requests/", response
+
+
+async def update_status(c, ctx):
+    if not ctx.own_requests:
+        return None
+    body = {"id": ctx.rng.choice(ctx.own_requests), "status": ctx.rng.choice(["Approved", "For Print", "For Pickup", "Returned"])}
+    response = await c.post("/document-requests/status", json=body)
+    if response.status_code == 200:
+        if body["id"] in ctx.returned:
+            ctx.returned.remove(body["id"])
+        if body["status"] == "Returned":
+            ctx.returned.append(body["id"])
+    return "POST /document-requests/status", response
+
+
+async def bulk_status(c, ctx):
+    if len(ctx.own_requests) < 2:
+        return None
+    ids = ctx.rng.sample(ctx.own_requests, min(len(ctx.own_requests), 20))
+    body = {"items": [{"id": i, "status": "Approved"} for i in ids]}
+    return "POST /document-requests/status/bulk", await c.post("/document-requests/status/bulk", json=body)
+
+
+async def update_request(c, ctx):
+    if not ctx.returned:  # only Returned requests can be resubmitted
+        return None
+    request_id = ctx.returned.pop(0)
+    return "POST /document-requests/{id}/update", await c.post(
+        f"/document-requests/{request_id}/update", json={"notes": "corrected", "purpose": "Employment"})
+
+
+async def delete_request(c, ctx):
+    if len(ctx.own_requests) < 20:  # keep a pool for the status/update operations
+        return None
+    request_id = ctx.own_requests.pop(0)
+    if request_id in ctx.returned:
+        ctx.returned.remove(request_id)
+    return "DELETE /document-requests/{id}", await c.delete(f"/document-requests/{request_id}")
+
+
+async def mark_all_read(c, ctx):
+    if (signed_in := ctx.signed_in()) is None:
+        return None
+    user_id, headers = signed_in
+    return "PUT /notifications/users/{id}/read", await c.put(f"/notifications/users/{user_id}/read", headers=headers)
+
+
+async def mark_one_read(c, ctx):
+    if (signed_in := ctx.signed_in()) is None:
+        return None
+    user_id, headers = signed_in
+    page = (await c.get(
+        f"/notifications/users/{user_id}", params={"limit": 1, "is_read": False}, headers=headers
+    )).json()
+    if not page.get("items"):
+        return None
+    return "PUT /notifications/{id}/read", await c.put(f"/notifications/{page['items'][0]['id']}/read", headers=headers)
+
+
+# (operation, weight, writes): weights follow a resident-heavy day, mostly reads
+OPERATIONS = [
+    (list_requests, 12, False), (list_requests_by_contact, 8, False), (list_requests_by_status, 5, False),
+    (request_stats, 3, False), (request_changes, 3, False),
+    (list_users, 4, False), (pending_users, 3, False), (search_users, 4, False), (get_user, 6, False),
+    (user_login, 2, False), (auth_login, 2, False), (auth_me, 3, False),
+    (inbox, 10, False), (unread_count, 8, False), (notification_changes, 3, False),
+    (get_photo, 4, False), (pool_stats, 1, False),
+    (register, 1, True), (update_user, 1, True), (delete_user, 0.5, True),
+    (create_request, 3, True), (update_status, 2, True), (bulk_status, 0.5, True),
+    (update_request, 1, True), (delete_request, 0.5, True),
+    (mark_all_read, 1, True), (mark_one_read, 1, True),
+]
+
+
+# ---------------- Runner ----------------
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # route -> [ms]
+        self.statuses = defaultdict(lambda: defaultdict(int))  # route -> {status: n}
+
+    def add(self, route: str, status, elapsed_ms: float):
+        self.latencies[route].append(elapsed_ms)
+        self.statuses[route][str(status)] += 1
+
+    def report(self, seconds: float) -> dict:
+        endpoints = {}
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            statuses = dict(sorted(self.statuses[route].items()))
+            endpoints[route] = {
+                "count": len(values),
+                "rps": round(len(values) / seconds, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "max_ms": round(values[-1], 2),
+                "errors": sum(n for status, n in statuses.items() if not status.startswith(("2", "3"))),
+                "statuses": statuses,
+            }
+        everything = sorted(v for values in self.latencies.values() for v in values)
+        total = {
+            "count": len(everything),
+            "rps": round(len(everything) / seconds, 2),
+            "p50_ms": round(percentile(everything, 50), 2) if everything else None,
+            "p95_ms": round(percentile(everything, 95), 2) if everything else None,
+            "p99_ms": round(percentile(everything, 99), 2) if everything else None,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+        }
+        return {"total": total, "endpoints": endpoints}
+
+
+async def client_loop(client, ctx: Context, operations, recorder: Recorder, warmup_until: float, deadline: float):
+    functions = [op for op, _, _ in operations]
+    weights = [weight for _, weight, _ in operations]
+    while time.perf_counter() < deadline:
+        operation = ctx.rng.choices(functions, weights)[0]
+        start = time.perf_counter()
+        try:
+            result = await operation(client, ctx)
+        except httpx.HTTPError as e:
+            result, status = (operation.__name__, None), e.__class__.__name__
+        else:
+            status = result[1].status_code if result else None
+        if result is None:
+            continue
+        if start >= warmup_until:
+            recorder.add(result[0], status, (time.perf_counter() - start) * 1000)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    operations = [op for op in OPERATIONS if not (args.read_only and op[2])]
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.in_process:
+        from main import app  # only needed for this mode
+
+        transport = httpx.ASGITransport(app=app)
+        lifespan = app.router.lifespan_context(app)
+        base_url = "http://in-process"
+    else:
+        transport, lifespan, base_url = None, None, args.url.rstrip("/")
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        async with httpx.AsyncClient(base_url=base_url, transport=transport, timeout=timeout, limits=limits) as client:
+            ctx = await prepare(client, rng)
+            recorder = Recorder()
+            started_at = datetime.now(timezone.utc)
+            start = time.perf_counter()
+            warmup_until, deadline = start + args.warmup, start + args.warmup + args.duration
+            await asyncio.gather(*(
+                client_loop(client, ctx, operations, recorder, warmup_until, deadline) for _ in range(args.concurrency)
+            ))
+            measured = max(time.perf_counter() - warmup_until, 1e-9)
+            stats = (await client.get("/document-requests/stats")).json()
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "commit": git_commit(),
+            "target": "in-process" if args.in_process else base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(measured, 2),
+            "warmup_s": args.warmup,
+            "read_only": args.read_only,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "dataset": {"residents_sampled": len(ctx.residents), "document_requests": stats.get("total")},
+        },
+        **recorder.report(measured),
+    }
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<44} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for route, e in report["endpoints"].items():
+        print(f"{route:<44} {e['count']:>7} {e['rps']:>8} {e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['errors']:>7}")
+    t = report["total"]
+    print(f"{'TOTAL':<44} {t['count']:>7} {t['rps']:>8} {t['p50_ms']:>8} {t['p95_ms']:>8} {t['p99_ms']:>8} {t['errors']:>7}")
+
+
+# ---------------- Compare two reports ----------------
+def compare(base: dict, new: dict, threshold: float, min_ms: float) -> int:
+    """Print per-endpoint deltas; returns how many endpoints regressed on p95 or p99."""
+    def change(old, cur):
+        return (cur - old) / old if old else 0.0
+
+    regressions = 0
+    print(f"{base['meta'].get('commit')} → {new['meta'].get('commit')}  (regression: > {threshold:.0%} and > {min_ms} ms)")
+    print(f"{'endpoint':<44} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'rps':>14}")
+    for route in sorted(base["endpoints"].keys() | new["endpoints"].keys()):
+        old, cur = base["endpoints"].get(route), new["endpoints"].get(route)
+        if old is None or cur is None:
+            print(f"{route:<44} {'only in ' + ('new' if old is None else 'base'):>16}")
+            continue
+        cells, regressed = [], False
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            delta = change(old[key], cur[key])
+            cells.append(f"{cur[key]:>8} ({delta:+.0%})")
+            if key in ("p95_ms", "p99_ms") and delta > threshold and cur[key] - old[key] > min_ms:
+                regressed = True
+        regressions += regressed
+        print(f"{'❌' if regressed else '  '}{route:<42} " + " ".join(f"{c:>16}" for c in cells))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test every router and report latency percentiles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="drive load and write a JSON report")
+    run_parser.add_argument("--url", default="http://localhost:8000")
+    run_parser.add_argument("--in-process", action="store_true", help="serve main.app in this process instead of --url")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="virtual clients")
+    run_parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=3, help="seconds before measuring")
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument("--read-only", action="store_true", help="skip every write operation")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", help="write the JSON report here (default: load-<commit>-<time>.json)")
+
+    compare_parser = commands.add_parser("compare", help="diff two reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative p95/p99 increase that fails")
+    compare_parser.add_argument("--min-ms", type=float, default=1.0, help="ignore smaller absolute increases")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f_base, open(args.new) as f_new:
+            failed = compare(json.load(f_base), json.load(f_new), args.threshold, args.min_ms)
+        print(f"{'❌' if failed else '✅'} {failed} endpoint(s) regressed")
+        raise SystemExit(1 if failed else 0)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    out = args.out or f"load-{report['meta']['commit'] or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report written to {out}")
@@ -1,13 +1,17 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routes import users, document_requests, notifications
-from database import Base, engine
-from seed_admins import seed_admins
-
-# ---------------------------
-# Database initialization
-# ---------------------------
-Base.metadata.create_all(bind=engine)
+from routes import auth, users, document_requests, notifications, photos, internal
+from broker import broker
+from outbox import dispatcher
+from delivery import delivery_worker
+from counters import reconciler
+from retention import retention_job
+import bootstrap
+from auth import require_staff
+from bootstrap import readiness
+from database import engine, async_engine, pool_stats
+import metrics
 
 # ---------------------------
 # FastAPI app setup
@@ -34,6 +38,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------------------------
+# Performance metrics (GET /metrics)
+# ---------------------------
+metrics.instrument(async_engine.sync_engine, "async")
+metrics.instrument(engine, "sync")
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ---------------------------
 # Root endpoints
 # ---------------------------
@@ -46,21 +57,62 @@ def read_root():
 def ping():
     return {"message": "Backend is alive!"}
 
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until startup finished, while the schema is behind or the database is unreachable.
+    /ping stays a liveness probe and never touches the database."""
+    report = await readiness.check()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_staff)])
+def get_metrics():
+    """Prometheus scrape endpoint (this worker's counters); approved staff or INTERNAL_API_TOKEN only."""
+    return PlainTextResponse(metrics.render(pool_stats()), media_type="text/plain; version=0.0.4")
+
 # ---------------------------
 # Routers
 # ---------------------------
+app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(document_requests.router)
 app.include_router(notifications.router)
+app.include_router(photos.router)
+app.include_router(internal.router)
 
 # ---------------------------
 # Startup event
 # ---------------------------
 @app.on_event("startup")
 def startup_tasks():
-    """Tasks that run when the backend starts."""
-    seed_admins()
-    print("✅ Startup complete — routes loaded:")
-    for route in app.routes:
-        if hasattr(route, "methods"):
-            print(f"  {route.path} → {list(route.methods)}")
+    """Schema migrations and admin seeding (BOOT_MODE=migrate), or just a schema check (BOOT_MODE=check)."""
+    bootstrap.startup()
+    if bootstrap.LOG_ROUTES:
+        print("✅ Routes loaded:")
+        for route in app.routes:
+            if hasattr(route, "methods"):
+                print(f"  {route.path} → {list(route.methods)}")
+
+
+@app.on_event("startup")
+async def start_broker():
+    """Start the notification pub/sub backend (LISTEN connection for Postgres), the outbox dispatcher,
+    the SMS delivery worker, the periodic counter reconciliation and the notification retention sweep."""
+    await broker.start()
+    await dispatcher.start()
+    await delivery_worker.start()
+    await reconciler.start()
+    await retention_job.start()
+    readiness.mark_started()
+    print(f"✅ Startup complete in {readiness.boot_seconds}s ({bootstrap.BOOT_MODE} mode).")
+
+
+@app.on_event("shutdown")
+async def stop_broker():
+    readiness.stopping = True
+    await retention_job.stop()
+    await reconciler.stop()
+    await dispatcher.stop()
+    await delivery_worker.stop()
+    await broker.stop()
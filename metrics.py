@@ -0,0 +1,261 @@
+# metrics.py
+"""
+Request-level performance metrics, exposed in Prometheus text format on GET /metrics.
+
+MetricsMiddleware times every request under its route template (not the raw
+path, so ids do not explode the label set) and records request/response
+sizes. SQLAlchemy cursor events add each query's count and time to the
+current request's RequestTrace (a contextvar, so it follows the request into
+the async engine's greenlets and threadpool calls), and pool checkouts add
+their wait. Requests slower than METRICS_SLOW_REQUEST_MS are printed as one
+JSON line with their SQL statements.
+
+Counters live in each worker process; scrape every worker (or run one).
+The endpoint is staff-only (auth.require_staff: an approved secretary or
+captain, whose role only staff can grant): give the scraper
+INTERNAL_API_TOKEN as its bearer token (Prometheus `authorization:
+{credentials: …}`).
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))  # 0 = log nothing
+METRICS_SLOW_MAX_STATEMENTS = int(os.getenv("METRICS_SLOW_MAX_STATEMENTS", "50"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+
+# ---------------- Metric types ----------------
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    parts = [f'{n}="{escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Cumulative buckets per label set, as Prometheus expects them."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += n
+                    le = 'le="{}"'.format(bound if bound == "+Inf" else float(bound))
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+# ---------------- Metrics ----------------
+ROUTE = ("method", "route")
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route template.", ROUTE + ("status",))
+REQUEST_BYTES = Histogram("http_request_size_bytes", "Request body size.", ROUTE, SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "Response body size.", ROUTE, SIZE_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "SQL statements executed per request.", ROUTE, QUERY_COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("http_request_db_seconds", "Time spent in SQL per request.", ROUTE)
+POOL_WAIT_SECONDS = Histogram("db_pool_wait_seconds", "Wait for a pooled connection, per checkout.", ("engine",), POOL_WAIT_BUCKETS)
+SLOW_REQUESTS = Counter("http_slow_requests_total", "Requests over METRICS_SLOW_REQUEST_MS.", ROUTE)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served.")
+METRICS = [REQUEST_SECONDS, REQUEST_BYTES, RESPONSE_BYTES, REQUEST_QUERIES, REQUEST_SQL_SECONDS,
+           POOL_WAIT_SECONDS, SLOW_REQUESTS, IN_FLIGHT]
+
+
+# ---------------- Per-request trace ----------------
+@dataclass
+class RequestTrace:
+    queries: int = 0
+    sql_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    statements: List[Tuple[str, float]] = field(default_factory=list)  # first N (sql, seconds)
+
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    trace = _trace.get()
+    if trace is not None:
+        trace.queries += 1
+        trace.sql_seconds += elapsed
+        if len(trace.statements) < METRICS_SLOW_MAX_STATEMENTS:
+            trace.statements.append((statement, elapsed))
+
+
+def _handle_error(exception_context):
+    # The statement failed: drop its start time so the stack stays balanced
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument(engine, name: str):
+    """Hook SQL timing and pool waits of a sync Engine (pass async_engine.sync_engine for the async one)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    engine.pool.stats.observers.append(lambda wait: _observe_pool_wait(name, wait))
+
+
+def _observe_pool_wait(engine_name: str, wait: float):
+    POOL_WAIT_SECONDS.observe(wait, engine_name)
+    trace = _trace.get()
+    if trace is not None:
+        trace.pool_wait_seconds += wait
+
+
+# ---------------- Middleware ----------------
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"  # unmatched paths would explode the label set
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (streams and SSE pass through untouched)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        sizes = {"request": 0, "response": 0}
+        status = {"code": 500}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc(amount=1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.inc(amount=-1)
+            _trace.reset(token)
+            self._record(scope, status["code"], elapsed, sizes, trace)
+
+    def _record(self, scope, status: int, elapsed: float, sizes: dict, trace: RequestTrace):
+        method, route = scope["method"], _route_template(scope)
+        REQUEST_SECONDS.observe(elapsed, method, route, str(status))
+        REQUEST_BYTES.observe(sizes["request"], method, route)
+        RESPONSE_BYTES.observe(sizes["response"], method, route)
+        REQUEST_QUERIES.observe(trace.queries, method, route)
+        REQUEST_SQL_SECONDS.observe(trace.sql_seconds, method, route)
+
+        if METRICS_SLOW_REQUEST_MS and elapsed * 1000 >= METRICS_SLOW_REQUEST_MS:
+            SLOW_REQUESTS.inc(method, route)
+            print(json.dumps({
+                "event": "slow_request",
+                "method": method,
+                "route": route,
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "db_queries": trace.queries,
+                "db_ms": round(trace.sql_seconds * 1000, 2),
+                "pool_wait_ms": round(trace.pool_wait_seconds * 1000, 2),
+                "request_bytes": sizes["request"],
+                "response_bytes": sizes["response"],
+                "statements": [{"sql": " ".join(sql.split())[:1000], "ms": round(seconds * 1000, 2)}
+                               for sql, seconds in trace.statements],
+            }), flush=True)
+
+
+# ---------------- Exposition ----------------
+def render(pools: dict) -> str:
+    """Prometheus text format: the metrics above plus pool gauges from database.pool_stats()."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    gauges = [
+        ("db_pool_checked_out", "Connections in use.", "checked_out", "gauge"),
+        ("db_pool_overflow", "Connections open beyond pool_size.", "overflow", "gauge"),
+        ("db_pool_checkouts_total", "Pool checkouts.", "checkouts", "counter"),
+        ("db_pool_timeouts_total", "Checkouts that timed out waiting.", "timeouts", "counter"),
+    ]
+    for name, help, key, kind in gauges:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{engine="{engine}"}} {snapshot[key]}' for engine, snapshot in sorted(pools.items())]
+    return "\n".join(lines) + "\n"
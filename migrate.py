@@ -0,0 +1,18 @@
+import argparse
+
+from database import engine
+import migrations
+
+
+# --- Apply or list schema migrations ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations.")
+    parser.add_argument("command", choices=["upgrade", "status"], nargs="?", default="upgrade")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for version, description, applied in migrations.status(engine):
+            print(f"{'✅' if applied else '⏳'} {version:04d} {description}")
+    else:
+        applied = migrations.upgrade(engine)
+        print(f"🎉 Schema up to date ({len(applied)} migration(s) applied).")
@@ -0,0 +1,58 @@
+import argparse
+
+from database import SessionLocal, engine
+import migrations
+from models import UserDB, DocumentRequestDB
+from photos import store_photo
+
+
+# --- Move inline base64 photos of one table into the blob store ---
+def migrate_table(model, batch_size: int) -> int:
+    moved = skipped = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = (
+                db.query(model.id, model.photo)
+                .filter(model.id > last_id, model.photo.isnot(None), model.photo_hash.is_(None))
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            for row_id, photo in rows:
+                last_id = row_id
+                try:
+                    photo_hash = store_photo(photo)
+                except ValueError:
+                    skipped += 1  # not base64 (e.g. seeded "default_photo.png"), keep inline
+                    continue
+                db.query(model).filter(model.id == row_id).update(
+                    {model.photo_hash: photo_hash, model.photo: None},
+                    synchronize_session=False,
+                )
+                moved += 1
+
+            db.commit()  # one commit per batch keeps locks short
+            print(f"  {model.__tablename__}: {moved} moved, {skipped} skipped (last id {last_id})")
+    finally:
+        db.close()
+    return moved
+
+
+def migrate_photos(batch_size: int = 500):
+    migrations.upgrade(engine)  # photo_hash columns (0002)
+    for model in (UserDB, DocumentRequestDB):
+        migrate_table(model, batch_size)
+
+
+# --- Run directly ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline base64 photos into the blob store.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    migrate_photos(args.batch_size)
+    print("🎉 Photo migration complete.")
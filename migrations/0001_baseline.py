@@ -0,0 +1,90 @@
+"""
+The schema as it stood when versioned migrations were introduced.
+
+A database created by the app before then already has some of these tables
+(create_all at startup); only the missing ones are created. Later changes
+belong in their own migrations, never here: this file must not follow the
+models.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, func,
+)
+
+description = "baseline schema"
+
+meta = MetaData()
+
+users = Table(
+    "users", meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("first_name", String, nullable=False),
+    Column("middle_name", String, nullable=True),
+    Column("last_name", String, nullable=False),
+    Column("dob", DateTime, nullable=False),
+    Column("gender", String, nullable=False),
+    Column("civil_status", String, nullable=False),
+    Column("contact", String, unique=True, index=True, nullable=False),
+    Column("purok", String, nullable=False),
+    Column("barangay", String, nullable=False),
+    Column("city", String, nullable=False),
+    Column("province", String, nullable=False),
+    Column("postal_code", String, nullable=False),
+    Column("password", String, nullable=False),
+    Column("photo", Text, nullable=True),
+    Column("photo_hash", String(64), nullable=True, index=True),
+    Column("role", String, nullable=False),
+    Column("status", String),
+)
+
+document_requests = Table(
+    "document_requests", meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("document_type", String, nullable=False),
+    Column("purpose", String, nullable=False),
+    Column("copies", Integer, nullable=False),
+    Column("requirements", Text),
+    Column("photo", Text, nullable=True),
+    Column("photo_hash", String(64), nullable=True, index=True),
+    Column("status", String),
+    Column("action", String),
+    Column("notes", Text),
+    Column("contact", String, nullable=False, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("pickup_date", DateTime(timezone=True), nullable=True),
+    Column("is_deleted", Boolean, nullable=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+)
+_live = document_requests.c.is_deleted == False  # noqa: E712
+Index("ix_document_requests_created_at_id", document_requests.c.created_at, document_requests.c.id)
+Index("ix_document_requests_live_created", document_requests.c.created_at, document_requests.c.id,
+      postgresql_where=_live, sqlite_where=_live)
+Index("ix_document_requests_live_contact_created", document_requests.c.contact, document_requests.c.created_at,
+      document_requests.c.id, postgresql_where=_live, sqlite_where=_live)
+Index("ix_document_requests_live_status_created", func.lower(document_requests.c.status),
+      document_requests.c.created_at, document_requests.c.id, postgresql_where=_live, sqlite_where=_live)
+
+notifications = Table(
+    "notifications", meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("type", String(50)),
+    Column("is_read", Boolean),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+    Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+    Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at", "id"),
+)
+
+notification_outbox = Table(
+    "notification_outbox", meta,
+    Column("id", Integer, primary_key=True),
+    Column("notification_id", Integer, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+
+def upgrade(conn):
+    meta.create_all(conn)
@@ -0,0 +1,15 @@
+"""Content-addressed photos: photo_hash columns, inline photo becomes optional."""
+from sqlalchemy import text
+
+from migrations import has_column
+
+description = "photo_hash columns"
+
+
+def upgrade(conn):
+    for table in ("users", "document_requests"):
+        if not has_column(conn, table, "photo_hash"):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN photo_hash VARCHAR(64)"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_photo_hash ON {table} (photo_hash)"))
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN photo DROP NOT NULL"))
@@ -0,0 +1,28 @@
+"""Indexes for the list, inbox and unread-count queries."""
+from migrations import run_ddl
+
+description = "hot-path composite, partial and functional indexes"
+
+# Partial (is_deleted = false) and lower(status) indexes for GET /document-requests/,
+# (user_id, is_read, created_at) for the inbox, FK indexes for cascades
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_contact ON document_requests (contact)",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_created_at_id ON document_requests (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_id ON document_requests (id)",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_live_contact_created"
+    " ON document_requests (contact, created_at, id) WHERE is_deleted = {false}",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_live_created"
+    " ON document_requests (created_at, id) WHERE is_deleted = {false}",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_live_status_created"
+    " ON document_requests (lower(status), created_at, id) WHERE is_deleted = {false}",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_photo_hash ON document_requests (photo_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_user_id ON document_requests (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_id ON notifications (id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_created ON notifications (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_read_created ON notifications (user_id, is_read, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notification_outbox_notification_id ON notification_outbox (notification_id)",
+]
+
+
+def upgrade(conn):
+    run_ddl(conn, INDEXES)
@@ -0,0 +1,90 @@
+"""Store request/user status as smallint codes and seed the transition table."""
+from sqlalchemy import (
+    Boolean, Column, Integer, MetaData, SmallInteger, String, Table, Text, func, inspect, insert, select, text,
+)
+
+from migrations import run_ddl
+
+description = "smallint status codes and request_status_transitions"
+
+# Codes as of this version (statuses.py may gain members later; these never change)
+REQUEST_STATUS_CODES = {
+    "Pending": 1, "Approved": 2, "For Print": 3, "For Pickup": 4,
+    "Completed": 5, "Returned": 6, "Rejected": 7, "Cancelled": 8,
+}
+USER_STATUS_CODES = {"Pending": 1, "Approved": 2, "Rejected": 3}
+
+meta = MetaData()
+request_status_transitions = Table(
+    "request_status_transitions", meta,
+    Column("id", Integer, primary_key=True),
+    Column("from_status", SmallInteger, nullable=True),  # NULL = from any status
+    Column("to_status", SmallInteger, nullable=False),
+    Column("default_action", String, nullable=False),
+    Column("default_notes", Text, nullable=False),
+    Column("accepts_notes", Boolean, nullable=False),
+    Column("sets_pickup_date", Boolean, nullable=False),
+)
+
+TRANSITIONS = [
+    # from_status, to_status, default_action, default_notes, accepts_notes, sets_pickup_date
+    (None, "Returned", "Update Request", "Request returned for correction", True, False),
+    (None, "Rejected", "Reject", "Request rejected", True, False),
+    (None, "Approved", "Review", "", False, False),
+    (None, "For Print", "Review", "", False, False),
+    (None, "Completed", "Review", "", False, False),
+    (None, "For Pickup", "Pickup", "", False, True),
+    ("Returned", "Pending", "Resubmitted", "", False, False),
+]
+
+
+def _is_coded(conn, table: str, codes: dict) -> bool:
+    column = next(c for c in inspect(conn).get_columns(table) if c["name"] == "status")
+    if isinstance(column["type"], (SmallInteger, Integer)):
+        return True
+    if conn.dialect.name == "sqlite":
+        # The declared type stays VARCHAR after _convert: coded once no label is left
+        labels = ", ".join(f"'{label.lower()}'" for label in codes)
+        return conn.execute(text(f"SELECT 1 FROM {table} WHERE lower(status) IN ({labels}) LIMIT 1")).first() is None
+    return False
+
+
+def _convert(conn, table: str, codes: dict):
+    labels = ", ".join(f"'{label.lower()}'" for label in codes)
+    unknown = conn.execute(text(
+        f"SELECT DISTINCT status FROM {table} WHERE status IS NOT NULL AND lower(status) NOT IN ({labels})"
+    )).scalars().all()
+    if unknown:
+        raise RuntimeError(f"{table}.status has values with no status code: {unknown}")
+
+    case = " ".join(f"WHEN '{label.lower()}' THEN {code}" for label, code in codes.items())
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN status DROP DEFAULT"))
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN status TYPE SMALLINT USING (CASE lower(status) {case} END)"))
+    else:
+        # SQLite keeps the declared VARCHAR affinity; StatusCode reads the codes back either way
+        conn.execute(text(f"UPDATE {table} SET status = CASE lower(status) {case} END WHERE status IS NOT NULL"))
+
+
+def upgrade(conn):
+    if not _is_coded(conn, "users", USER_STATUS_CODES):
+        _convert(conn, "users", USER_STATUS_CODES)
+    if not _is_coded(conn, "document_requests", REQUEST_STATUS_CODES):
+        _convert(conn, "document_requests", REQUEST_STATUS_CODES)
+    # 0003 built it on lower(status), which no longer works on codes
+    conn.execute(text("DROP INDEX IF EXISTS ix_document_requests_live_status_created"))
+    run_ddl(conn, [
+        "CREATE INDEX IF NOT EXISTS ix_document_requests_live_status_created"
+        " ON document_requests (status, created_at, id) WHERE is_deleted = {false}",
+    ])
+
+    request_status_transitions.create(conn, checkfirst=True)
+    if not conn.execute(select(func.count()).select_from(request_status_transitions)).scalar():
+        conn.execute(insert(request_status_transitions), [
+            {
+                "from_status": REQUEST_STATUS_CODES[from_status] if from_status else None,
+                "to_status": REQUEST_STATUS_CODES[to_status], "default_action": action,
+                "default_notes": notes, "accepts_notes": accepts_notes, "sets_pickup_date": sets_pickup_date,
+            }
+            for from_status, to_status, action, notes, accepts_notes, sets_pickup_date in TRANSITIONS
+        ])
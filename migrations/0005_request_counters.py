@@ -0,0 +1,24 @@
+"""Dashboard counters per (status, document_type)."""
+from sqlalchemy import Column, Integer, MetaData, SmallInteger, String, Table, func, select
+
+from migrations import run_ddl
+
+description = "request_counters table, backfilled from document_requests"
+
+meta = MetaData()
+request_counters = Table(
+    "request_counters", meta,
+    Column("status", SmallInteger, primary_key=True),
+    Column("document_type", String, primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+
+def upgrade(conn):
+    request_counters.create(conn, checkfirst=True)
+    if not conn.execute(select(func.count()).select_from(request_counters)).scalar():
+        run_ddl(conn, [
+            "INSERT INTO request_counters (status, document_type, count)"
+            " SELECT status, document_type, count(*) FROM document_requests"
+            " WHERE is_deleted = {false} GROUP BY status, document_type",
+        ])
@@ -0,0 +1,17 @@
+"""users.updated_at for conditional GETs on /users."""
+from sqlalchemy import text
+
+from migrations import has_column, run_ddl
+
+description = "users.updated_at"
+
+
+def upgrade(conn):
+    if not has_column(conn, "users", "updated_at"):
+        # SQLite cannot ADD COLUMN with a non-constant default: add, backfill, then tighten on Postgres
+        conn.execute(text("ALTER TABLE users ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE"))
+        conn.execute(text("UPDATE users SET updated_at = CURRENT_TIMESTAMP"))
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT now()"))
+            conn.execute(text("ALTER TABLE users ALTER COLUMN updated_at SET NOT NULL"))
+    run_ddl(conn, ["CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)"])
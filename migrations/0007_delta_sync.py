@@ -0,0 +1,21 @@
+"""notifications.updated_at and (updated_at, id) indexes for delta sync."""
+from sqlalchemy import text
+
+from migrations import has_column, run_ddl
+
+description = "delta sync: notifications.updated_at and (updated_at, id) indexes"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_updated_id ON document_requests (updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_document_requests_contact_updated_id ON document_requests (contact, updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_updated ON notifications (user_id, updated_at, id)",
+]
+
+
+def upgrade(conn):
+    if not has_column(conn, "notifications", "updated_at"):
+        conn.execute(text("ALTER TABLE notifications ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE"))
+        conn.execute(text("UPDATE notifications SET updated_at = created_at"))
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE notifications ALTER COLUMN updated_at SET DEFAULT now()"))
+    run_ddl(conn, INDEXES)
@@ -0,0 +1,44 @@
+"""users.name_key for duplicate checks and GET /users/search."""
+from sqlalchemy import bindparam, column, select, table, text, update
+
+from migrations import has_column, run_ddl
+
+description = "users.name_key, backfilled, with btree (and pg_trgm) indexes"
+
+BATCH_SIZE = 1000
+
+# The users columns this migration touches, as they are at this version
+users = table("users", column("id"), column("first_name"), column("last_name"), column("name_key"))
+
+
+def name_key(first_name, last_name) -> str:
+    """models.name_key as it was at this version ("first last"; 0014 keys the fields apart)."""
+    return " ".join(f"{first_name or ''} {last_name or ''}".split()).casefold()
+
+
+def upgrade(conn):
+    if not has_column(conn, "users", "name_key"):
+        conn.execute(text("ALTER TABLE users ADD COLUMN name_key VARCHAR"))
+
+    # Backfill in keyset batches (the normalization lives in Python)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(users.c.id, users.c.first_name, users.c.last_name)
+            .where(users.c.id > last_id, users.c.name_key.is_(None))
+            .order_by(users.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update(users).where(users.c.id == bindparam("b_id")).values(name_key=bindparam("b_key")),
+            [{"b_id": r.id, "b_key": name_key(r.first_name, r.last_name)} for r in rows],
+        )
+        last_id = rows[-1].id
+
+    run_ddl(conn, ["CREATE INDEX IF NOT EXISTS ix_users_name_key ON users (name_key)"])
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_users_name_key_trgm ON users USING gin (name_key gin_trgm_ops)"
+        ))
@@ -0,0 +1,15 @@
+"""Indexes for the paginated user directory and the pending-approvals view."""
+from migrations import run_ddl
+
+description = "user directory filter indexes and partial pending index"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_users_status_id ON users (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_role_status_id ON users (role, status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_barangay_purok_id ON users (barangay, purok, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_pending_role_id ON users (role, id) WHERE status = 1",  # 1 = Pending
+]
+
+
+def upgrade(conn):
+    run_ddl(conn, INDEXES)
@@ -0,0 +1,29 @@
+"""Queue of SMS/push deliveries per notification (delivery.py)."""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, SmallInteger, String, Table, Text, func
+
+description = "notification_deliveries queue with a partial index on due pending rows"
+
+meta = MetaData()
+Table("notifications", meta, Column("id", Integer, primary_key=True))  # FK target only, never created here
+notification_deliveries = Table(
+    "notification_deliveries", meta,
+    Column("id", Integer, primary_key=True),
+    Column("notification_id", Integer, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("channel", String, nullable=False),
+    Column("recipient", String, nullable=False),
+    Column("status", SmallInteger, nullable=False),  # 1 = Pending, 2 = Sent, 3 = Dead
+    Column("attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=False),
+    Column("last_error", Text, nullable=True),
+    Column("provider_message_id", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("sent_at", DateTime(timezone=True), nullable=True),
+)
+_pending = notification_deliveries.c.status == 1
+Index("ix_notification_deliveries_due", notification_deliveries.c.next_attempt_at, notification_deliveries.c.id,
+      postgresql_where=_pending, sqlite_where=_pending)
+Index("ix_notification_deliveries_status", notification_deliveries.c.status)
+
+
+def upgrade(conn):
+    notification_deliveries.create(conn, checkfirst=True)
@@ -0,0 +1,27 @@
+"""notifications_archive table and the created_at index the retention sweep walks (retention.py)."""
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, Text, func
+
+from migrations import run_ddl
+
+description = "notifications_archive table and notifications (created_at, id) index"
+
+meta = MetaData()
+notifications_archive = Table(
+    "notifications_archive", meta,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("title", String(255), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("type", String(50)),
+    Column("is_read", Boolean),
+    Column("created_at", DateTime(timezone=True)),
+    Column("updated_at", DateTime(timezone=True)),
+    Column("user_id", Integer, nullable=True),
+    Column("archived_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Index("ix_notifications_archive_user_created", "user_id", "created_at", "id"),
+    Index("ix_notifications_archive_archived", "archived_at", "id"),
+)
+
+
+def upgrade(conn):
+    notifications_archive.create(conn, checkfirst=True)
+    run_ddl(conn, ["CREATE INDEX IF NOT EXISTS ix_notifications_created ON notifications (created_at, id)"])
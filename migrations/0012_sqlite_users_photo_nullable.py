@@ -0,0 +1,73 @@
+"""
+SQLite only: rebuild users so photo is nullable.
+
+0002 made the inline photo optional with ALTER COLUMN … DROP NOT NULL, which
+SQLite does not have; databases created before 0001 kept photo NOT NULL and
+rejected every registration that only stores a photo_hash. SQLite changes a
+constraint by copying into a new table. Fresh databases already have a
+nullable photo and skip this.
+"""
+from sqlalchemy import text
+
+from migrations import run_ddl
+
+description = "SQLite: users.photo nullable (table rebuild)"
+
+COLUMNS = (
+    "id, first_name, middle_name, last_name, dob, gender, civil_status, contact, purok, barangay, city,"
+    " province, postal_code, password, photo, photo_hash, role, status, name_key, updated_at"
+)
+
+CREATE_TABLE = """
+CREATE TABLE users_rebuilt (
+    id INTEGER NOT NULL,
+    first_name VARCHAR NOT NULL,
+    middle_name VARCHAR,
+    last_name VARCHAR NOT NULL,
+    dob DATETIME NOT NULL,
+    gender VARCHAR NOT NULL,
+    civil_status VARCHAR NOT NULL,
+    contact VARCHAR NOT NULL,
+    purok VARCHAR NOT NULL,
+    barangay VARCHAR NOT NULL,
+    city VARCHAR NOT NULL,
+    province VARCHAR NOT NULL,
+    postal_code VARCHAR NOT NULL,
+    password VARCHAR NOT NULL,
+    photo TEXT,
+    photo_hash VARCHAR(64),
+    role VARCHAR NOT NULL,
+    status SMALLINT,
+    name_key VARCHAR,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (id)
+)
+"""
+
+# Every users index up to this version (dropping the old table dropped them)
+INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_contact ON users (contact)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_photo_hash ON users (photo_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_key ON users (name_key)",
+    "CREATE INDEX IF NOT EXISTS ix_users_status_id ON users (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_role_status_id ON users (role, status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_barangay_purok_id ON users (barangay, purok, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_pending_role_id ON users (role, id) WHERE status = 1",
+]
+
+
+def upgrade(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    photo = next(row for row in conn.execute(text("PRAGMA table_info(users)")) if row.name == "photo")
+    if not photo.notnull:
+        return
+    # Foreign keys are not enforced (no PRAGMA foreign_keys), so references to users survive the swap
+    conn.execute(text("DROP TABLE IF EXISTS users_rebuilt"))
+    conn.execute(text(CREATE_TABLE))
+    conn.execute(text(f"INSERT INTO users_rebuilt ({COLUMNS}) SELECT {COLUMNS} FROM users"))
+    conn.execute(text("DROP TABLE users"))
+    conn.execute(text("ALTER TABLE users_rebuilt RENAME TO users"))
+    run_ddl(conn, INDEXES)
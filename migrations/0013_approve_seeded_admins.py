@@ -0,0 +1,14 @@
+"""Approve the seeded secretary/captain: login and the staff guard now require approval for every role."""
+from sqlalchemy import text
+
+description = "approve seeded admin accounts"
+
+
+def upgrade(conn):
+    # Frozen from seed_admins.py; 2 = Approved, 1 = Pending (0004). Self-registered staff stay pending.
+    conn.execute(text(
+        "UPDATE users SET status = 2, updated_at = CURRENT_TIMESTAMP "
+        "WHERE status = 1 AND first_name = 'System' "
+        "AND ((role = 'secretary' AND last_name = 'Secretary' AND contact = '+639123456789') "
+        "OR (role = 'captain' AND last_name = 'Captain' AND contact = '+639987654321'))"
+    ))
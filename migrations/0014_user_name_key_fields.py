@@ -0,0 +1,38 @@
+"""Re-key users.name_key with first and last name kept apart."""
+from sqlalchemy import bindparam, column, or_, select, table, update
+
+description = "users.name_key as first<US>last"
+
+BATCH_SIZE = 1000
+SEPARATOR = "\x1f"
+
+# The users columns this migration touches, as they are at this version
+users = table("users", column("id"), column("first_name"), column("last_name"), column("name_key"))
+
+
+def normalize_name(value) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def name_key(first_name, last_name) -> str:
+    """models.name_key as of this version."""
+    return f"{normalize_name(first_name)}{SEPARATOR}{normalize_name(last_name)}"
+
+
+def upgrade(conn):
+    # Keys written by 0008 (or the app before this version) have no separator
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(users.c.id, users.c.first_name, users.c.last_name)
+            .where(users.c.id > last_id,
+                   or_(users.c.name_key.is_(None), ~users.c.name_key.contains(SEPARATOR, autoescape=True)))
+            .order_by(users.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update(users).where(users.c.id == bindparam("b_id")).values(name_key=bindparam("b_key")),
+            [{"b_id": r.id, "b_key": name_key(r.first_name, r.last_name)} for r in rows],
+        )
+        last_id = rows[-1].id
@@ -0,0 +1,102 @@
+"""
+users.updated_at NOT NULL with a server default, and a server default on
+notifications.updated_at, on every database.
+
+0006 and 0007 added these columns with ALTER TABLE, which on SQLite can
+neither set a non-constant default nor NOT NULL; only databases that went
+through the 0012 rebuild had them on users. SQLite gets a table rebuild
+where either is missing; Postgres already has them from 0006/0007 and the
+ALTERs below only restate them.
+"""
+from sqlalchemy import text
+
+from migrations import rebuild_sqlite_table
+
+description = "updated_at server defaults (and users NOT NULL) on SQLite"
+
+USERS_COLUMNS = (
+    "id, first_name, middle_name, last_name, dob, gender, civil_status, contact, purok, barangay, city,"
+    " province, postal_code, password, photo, photo_hash, role, status, name_key, updated_at"
+)
+
+USERS_TABLE = """
+CREATE TABLE users_rebuilt (
+    id INTEGER NOT NULL,
+    first_name VARCHAR NOT NULL,
+    middle_name VARCHAR,
+    last_name VARCHAR NOT NULL,
+    dob DATETIME NOT NULL,
+    gender VARCHAR NOT NULL,
+    civil_status VARCHAR NOT NULL,
+    contact VARCHAR NOT NULL,
+    purok VARCHAR NOT NULL,
+    barangay VARCHAR NOT NULL,
+    city VARCHAR NOT NULL,
+    province VARCHAR NOT NULL,
+    postal_code VARCHAR NOT NULL,
+    password VARCHAR NOT NULL,
+    photo TEXT,
+    photo_hash VARCHAR(64),
+    role VARCHAR NOT NULL,
+    status SMALLINT,
+    name_key VARCHAR,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (id)
+)
+"""
+
+USERS_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_contact ON users (contact)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_photo_hash ON users (photo_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_key ON users (name_key)",
+    "CREATE INDEX IF NOT EXISTS ix_users_status_id ON users (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_role_status_id ON users (role, status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_barangay_purok_id ON users (barangay, purok, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_pending_role_id ON users (role, id) WHERE status = 1",
+]
+
+NOTIFICATIONS_COLUMNS = "id, title, message, type, is_read, created_at, updated_at, user_id"
+
+NOTIFICATIONS_TABLE = """
+CREATE TABLE notifications_rebuilt (
+    id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    type VARCHAR(50),
+    is_read BOOLEAN,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    user_id INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+)
+"""
+
+NOTIFICATIONS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_notifications_id ON notifications (id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_read_created ON notifications (user_id, is_read, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_created ON notifications (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_updated ON notifications (user_id, updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_created ON notifications (created_at, id)",
+]
+
+
+def _column(conn, table: str, name: str):
+    return next(row for row in conn.execute(text(f"PRAGMA table_info({table})")) if row.name == name)
+
+
+def upgrade(conn):
+    conn.execute(text("UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT now()"))
+        conn.execute(text("ALTER TABLE users ALTER COLUMN updated_at SET NOT NULL"))
+        conn.execute(text("ALTER TABLE notifications ALTER COLUMN updated_at SET DEFAULT now()"))
+        return
+
+    users_updated = _column(conn, "users", "updated_at")
+    if not users_updated.notnull or users_updated.dflt_value is None:
+        rebuild_sqlite_table(conn, "users", USERS_TABLE, USERS_COLUMNS, USERS_INDEXES)
+    if _column(conn, "notifications", "updated_at").dflt_value is None:
+        rebuild_sqlite_table(conn, "notifications", NOTIFICATIONS_TABLE, NOTIFICATIONS_COLUMNS, NOTIFICATIONS_INDEXES)
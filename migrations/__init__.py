@@ -0,0 +1,127 @@
+# migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Each module in this package named `NNNN_<slug>.py` defines `description` and
+`upgrade(conn)`. Applied versions are recorded in `schema_migrations`; every
+migration runs in its own transaction.
+
+A migration never reads the models: its tables, indexes and status codes are
+frozen in the file (literal DDL or its own Table/Index definitions), so
+editing a model cannot change what an old migration does. Nor is a released
+migration ever edited: a schema fix is a new migration. Migrations must
+also be idempotent, because a database created before versioning already
+has part of the schema. check_migrations.py upgrades both an empty database
+and one created by the pre-migration app, and compares them with the models.
+"""
+import importlib
+import pkgutil
+import re
+from contextlib import contextmanager, nullcontext
+from typing import List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+
+MODULE_RE = re.compile(r"^(\d{4})_\w+$")
+ADVISORY_LOCK_KEY = 42_0011  # any constant shared by all workers
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+
+# ---------------- Helpers for migration modules ----------------
+def has_column(conn, table: str, column: str) -> bool:
+    return column in {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def run_ddl(conn, statements):
+    """Run DDL frozen in a migration as literal SQL; "{false}" becomes the dialect's boolean false."""
+    false = "false" if conn.dialect.name == "postgresql" else "0"
+    for statement in statements:
+        conn.execute(text(statement.format(false=false)))
+
+
+def rebuild_sqlite_table(conn, table: str, create_sql: str, columns: str, indexes):
+    """
+    SQLite cannot change a column's constraints or default in place: create
+    `create_sql` (a CREATE TABLE for "<table>_rebuilt"), copy `columns`
+    across, swap the tables and recreate `indexes` (dropped with the old one).
+    Foreign keys are not enforced (no PRAGMA foreign_keys), so references to
+    the table survive the swap.
+    """
+    rebuilt = f"{table}_rebuilt"
+    conn.execute(text(f"DROP TABLE IF EXISTS {rebuilt}"))
+    conn.execute(text(create_sql))
+    conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table}"))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table}"))
+    run_ddl(conn, indexes)
+
+
+# ---------------- Runner ----------------
+def available() -> List[Tuple[int, str, object]]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = MODULE_RE.match(info.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            migrations.append((int(match.group(1)), module.description, module))
+    return sorted(migrations, key=lambda m: m[0])
+
+
+def applied_versions(conn) -> set:
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+@contextmanager
+def migration_lock(engine):
+    """Serialize concurrent runners (several workers booting) on Postgres."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            conn.commit()
+        try:
+            yield
+        finally:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                conn.commit()
+
+
+def pending_versions(conn) -> List[int]:
+    """Versions not applied yet, read without taking the lock (a cheap check before upgrade)."""
+    applied = applied_versions(conn) if inspect(conn).has_table("schema_migrations") else set()
+    return [version for version, _, _ in available() if version not in applied]
+
+
+def upgrade(engine, verbose: bool = True, lock: bool = True) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied.
+    Pass lock=False when the caller already holds migration_lock()."""
+    done = []
+    with migration_lock(engine) if lock else nullcontext():
+        with engine.begin() as conn:
+            _meta.create_all(conn)
+            applied = applied_versions(conn)
+
+        for version, description, module in available():
+            if version in applied:
+                continue
+            with engine.begin() as conn:
+                module.upgrade(conn)
+                conn.execute(schema_migrations.insert().values(version=version, description=description))
+            done.append(version)
+            if verbose:
+                print(f"✅ Applied migration {version:04d}: {description}")
+    return done
+
+
+def status(engine) -> List[Tuple[int, str, bool]]:
+    with engine.begin() as conn:
+        _meta.create_all(conn)
+        applied = applied_versions(conn)
+    return [(version, description, version in applied) for version, description, _ in available()]
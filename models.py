@@ -1,7 +1,31 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, event, inspect
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from photos import photo_url
+from statuses import StatusCode, RequestStatus, UserStatus, DeliveryStatus
+
+
+def row_photo_url(row):
+    """URL of the stored photo, falling back to a not-yet-migrated inline value.
+    The inline value is only used if already loaded (no lazy load under asyncio)."""
+    if row.photo_hash:
+        return photo_url(row.photo_hash)
+    return None if "photo" in inspect(row).unloaded else row.photo
+
+
+NAME_KEY_SEPARATOR = "\x1f"  # "Maria Clara"/"Santos" and "Maria"/"Clara Santos" are different people
+
+
+def normalize_name(value) -> str:
+    """Case- and spacing-insensitive form of one name field (str.split() also drops a stray separator)."""
+    return " ".join((value or "").split()).casefold()
+
+
+def name_key(first_name, last_name) -> str:
+    """Normalized first and last name, kept apart, for duplicate checks and name search."""
+    return f"{normalize_name(first_name)}{NAME_KEY_SEPARATOR}{normalize_name(last_name)}"
+
 
 # ---------------- User Table ----------------
 class UserDB(Base):
@@ -21,14 +45,43 @@ class UserDB(Base):
     province = Column(String, nullable=False)
     postal_code = Column(String, nullable=False)
     password = Column(String, nullable=False)
-    photo = Column(Text, nullable=False)
+    photo = Column(Text, nullable=True)  # legacy inline base64, see photo_hash
+    photo_hash = Column(String(64), nullable=True, index=True)
     role = Column(String, nullable=False)
-    status = Column(String, default="Pending")
+    status = Column(StatusCode(UserStatus), default="Pending")
+    # ✅ maintained from first/last name on every ORM write (see _set_name_key);
+    #    Postgres also has a pg_trgm GIN index on it (migration 0008)
+    name_key = Column(String, nullable=True, index=True)
+
+    # ✅ drives ETag / Last-Modified (max(updated_at) for the user list ETag, so indexed)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, index=True)
 
     # ✅ relationships
     document_requests = relationship("DocumentRequestDB", back_populates="user", cascade="all, delete-orphan")
     notifications = relationship("NotificationDB", back_populates="user", cascade="all, delete-orphan")
 
+    @property
+    def photo_url(self):
+        return row_photo_url(self)
+
+    # ✅ directory filters (keyset on id) and the pending-approvals queue
+    __table_args__ = (
+        Index("ix_users_status_id", status, id),
+        Index("ix_users_role_status_id", role, status, id),
+        Index("ix_users_barangay_purok_id", barangay, purok, id),
+        Index(
+            "ix_users_pending_role_id", role, id,
+            postgresql_where=(status == UserStatus.PENDING), sqlite_where=(status == UserStatus.PENDING),
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+
+@event.listens_for(UserDB, "before_insert")
+@event.listens_for(UserDB, "before_update")
+def _set_name_key(mapper, connection, user):
+    user.name_key = name_key(user.first_name, user.last_name)
+
 
 # ---------------- Document Requests Table ----------------
 class DocumentRequestDB(Base):
@@ -39,12 +92,13 @@ class DocumentRequestDB(Base):
     purpose = Column(String, nullable=False)
     copies = Column(Integer, nullable=False, default=1)
     requirements = Column(Text, default="")
-    photo = Column(Text, nullable=True)
-    status = Column(String, default="Pending")
+    photo = Column(Text, nullable=True)  # legacy inline base64, see photo_hash
+    photo_hash = Column(String(64), nullable=True, index=True)
+    status = Column(StatusCode(RequestStatus), default="Pending")
     action = Column(String, default="Review")
     notes = Column(Text, default="")
     contact = Column(String, nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # ✅ timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -58,6 +112,33 @@ class DocumentRequestDB(Base):
     # ✅ relationship
     user = relationship("UserDB", back_populates="document_requests")
 
+    @property
+    def photo_url(self):
+        return row_photo_url(self)
+
+    # ✅ keyset pagination order (created_at, id); the partial ones serve the
+    #    default list (is_deleted = false) with and without contact/status filters
+    __table_args__ = (
+        Index("ix_document_requests_created_at_id", created_at, id),
+        Index(
+            "ix_document_requests_live_created", created_at, id,
+            postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_document_requests_live_contact_created", contact, created_at, id,
+            postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_document_requests_live_status_created", status, created_at, id,
+            postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False),
+        ),
+        # delta sync (/changes): everything past (updated_at, id), optionally per contact
+        Index("ix_document_requests_updated_id", updated_at, id),
+        Index("ix_document_requests_contact_updated_id", contact, updated_at, id),
+    )
+    # ✅ fetch server-side timestamps via RETURNING instead of a lazy refresh
+    __mapper_args__ = {"eager_defaults": True}
+
 
 # ---------------- Notifications Table ----------------
 class NotificationDB(Base):
@@ -69,8 +150,105 @@ class NotificationDB(Base):
     type = Column(String(50), default="info")
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     # ✅ back_populates (not backref)
     user = relationship("UserDB", back_populates="notifications")
+
+    # ✅ per-user inbox ordering, plus is_read filtering / unread count
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at", "id"),
+        Index("ix_notifications_user_updated", "user_id", "updated_at", "id"),  # delta sync
+        Index("ix_notifications_created", "created_at", "id"),  # retention sweep, oldest first
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+
+# ---------------- Request Status Transitions ----------------
+class RequestStatusTransitionDB(Base):
+    """State machine for POST /document-requests/status (loaded once by state_machine.py)."""
+    __tablename__ = "request_status_transitions"
+
+    id = Column(Integer, primary_key=True)
+    from_status = Column(StatusCode(RequestStatus), nullable=True)  # NULL = from any status
+    to_status = Column(StatusCode(RequestStatus), nullable=False)
+    default_action = Column(String, nullable=False)
+    default_notes = Column(Text, nullable=False, default="")
+    accepts_notes = Column(Boolean, nullable=False, default=False)  # keep notes sent by the secretary
+    sets_pickup_date = Column(Boolean, nullable=False, default=False)
+
+
+# ---------------- Request Counters ----------------
+class RequestCounterDB(Base):
+    """Live (not deleted) requests per (status, document_type); maintained by counters.py."""
+    __tablename__ = "request_counters"
+
+    status = Column(StatusCode(RequestStatus), primary_key=True)
+    document_type = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ---------------- Notification Outbox ----------------
+class NotificationOutboxDB(Base):
+    """Written in the same transaction as its notification; drained by outbox.OutboxDispatcher."""
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    notification = relationship("NotificationDB")
+
+
+# ---------------- Notification Deliveries (SMS/push) ----------------
+class NotificationDeliveryDB(Base):
+    """One notification to one recipient over one channel; queued by the outbox dispatcher, sent by delivery.py."""
+    __tablename__ = "notification_deliveries"
+
+    id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False, index=True)
+    channel = Column(String, nullable=False)  # transport name, e.g. "sms"
+    recipient = Column(String, nullable=False)  # phone number in E.164 for sms
+    status = Column(StatusCode(DeliveryStatus), nullable=False, default="Pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)  # also the lease of a claimed batch
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    notification = relationship("NotificationDB")
+
+    # ✅ the worker's claim query: due pending deliveries, oldest first
+    __table_args__ = (
+        Index(
+            "ix_notification_deliveries_due", next_attempt_at, id,
+            postgresql_where=(status == DeliveryStatus.PENDING), sqlite_where=(status == DeliveryStatus.PENDING),
+        ),
+        Index("ix_notification_deliveries_status", status),
+    )
+
+
+# ---------------- Notification Archive ----------------
+class NotificationArchiveDB(Base):
+    """Notifications moved out of the hot table by retention.py; same columns plus archived_at."""
+    __tablename__ = "notifications_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # the id it had in notifications
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    type = Column(String(50), default="info")
+    is_read = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    user_id = Column(Integer, nullable=True)  # no FK: archived rows never block removing a user
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # ✅ per-user archive pages, and the archive purge by age
+    __table_args__ = (
+        Index("ix_notifications_archive_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_archive_archived", "archived_at", "id"),
+    )
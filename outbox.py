@@ -0,0 +1,145 @@
+# outbox.py
+import asyncio
+import os
+import traceback
+from datetime import datetime
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from broker import broker, notification_message
+from database import AsyncSessionLocal
+from delivery import delivery_worker, enqueue
+from models import NotificationDB, NotificationOutboxDB
+
+load_dotenv()
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1.0"))
+
+
+# ---------------- Write side ----------------
+def add_notification(db, user_id: Optional[int], title: str, message: str, type: str = "info") -> NotificationDB:
+    """
+    Stage a notification plus its outbox entry on `db`. Nothing is committed here:
+    both rows go out with the caller's own commit.
+    """
+    now = datetime.utcnow()
+    notif = NotificationDB(
+        user_id=user_id,
+        title=title,
+        message=message,
+        type=type,
+        is_read=False,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(notif)
+    db.add(NotificationOutboxDB(notification=notif))
+    return notif
+
+
+async def add_notifications(db, notifications: List[dict]):
+    """
+    Bulk variant of add_notification for set-based writes: one multi-row
+    INSERT for the notifications and one for their outbox entries.
+    Each dict needs user_id, title and message (type defaults to "info").
+    """
+    if not notifications:
+        return
+    now = datetime.utcnow()
+    ids = (await db.scalars(
+        insert(NotificationDB).returning(NotificationDB.id),
+        [{"type": "info", "is_read": False, "created_at": now, "updated_at": now, **n} for n in notifications],
+    )).all()
+    await db.execute(insert(NotificationOutboxDB), [{"notification_id": i} for i in ids])
+    db.info["outbox_written"] = True  # Core inserts bypass the after_flush hook
+
+
+# ---------------- Dispatcher ----------------
+class OutboxDispatcher:
+    """Background task that drains the outbox in batches, publishes to the broker and queues SMS deliveries."""
+
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self):
+        """Skip the poll wait (called after a local commit wrote outbox rows)."""
+        self._wakeup.set()
+
+    async def drain_once(self) -> int:
+        """Publish and delete one batch; returns how many entries were handled."""
+        async with AsyncSessionLocal() as db:
+            entries = (await db.scalars(
+                select(NotificationOutboxDB)
+                .options(joinedload(NotificationOutboxDB.notification))
+                .order_by(NotificationOutboxDB.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True, of=NotificationOutboxDB)  # workers split the backlog
+            )).all()
+            if not entries:
+                return 0
+
+            await broker.publish([notification_message(e.notification) for e in entries])
+            queued = await enqueue(db, [e.notification_id for e in entries])
+            await db.execute(delete(NotificationOutboxDB).where(
+                NotificationOutboxDB.id.in_([e.id for e in entries])
+            ))
+            await db.commit()
+            if queued:
+                delivery_worker.wake()
+            return len(entries)
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.drain_once() == self.batch_size:
+                    pass  # backlog: keep draining without waiting
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                print("⚠ Outbox dispatch failed, will retry")
+                traceback.print_exc()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+dispatcher = OutboxDispatcher()
+
+
+# ---------------- Session hooks ----------------
+@event.listens_for(Session, "after_flush")
+def _note_outbox_writes(session, flush_context):
+    if any(isinstance(obj, NotificationOutboxDB) for obj in session.new):
+        session.info["outbox_written"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session):
+    if session.info.pop("outbox_written", False):
+        dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_outbox_writes(session):
+    session.info.pop("outbox_written", None)
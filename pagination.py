@@ -0,0 +1,74 @@
+# pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# ---------------- Cursor encoding ----------------
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Pack the (sort key, id) of the last row into an opaque URL-safe token."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_col) -> Tuple[Any, int]:
+    """Unpack a cursor produced by encode_cursor, raise 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_col.type, DateTime) and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ---------------- Keyset pagination ----------------
+def page_stmt(stmt: Select, sort_col, id_col, cursor: Optional[str], limit: int) -> Select:
+    """
+    `stmt` ordered by (sort_col, id_col) descending, limited to one page (+1 row
+    to detect a next page). Seeks past the cursor with a row-value comparison
+    instead of OFFSET, so every page costs the same index range scan.
+    """
+    if cursor:
+        stmt = stmt.where(tuple_(sort_col, id_col) < decode_cursor(cursor, sort_col))
+    return stmt.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+async def paginate(
+    db: AsyncSession, stmt: Select, sort_col, id_col, cursor: Optional[str], limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of `stmt` (see page_stmt) and the cursor for the next one."""
+    result = await db.execute(page_stmt(stmt, sort_col, id_col, cursor, limit))
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+
+async def paginate_rows(
+    db: AsyncSession, stmt: Select, sort_col, id_col, cursor: Optional[str], limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """paginate() for column selects: returns Row tuples instead of ORM objects."""
+    rows = (await db.execute(page_stmt(stmt, sort_col, id_col, cursor, limit))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
@@ -0,0 +1,89 @@
+# photos.py
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+PHOTO_STORE_DIR = os.getenv("PHOTO_STORE_DIR", "photo_store")
+PHOTO_BASE_URL = os.getenv("PHOTO_BASE_URL", "").rstrip("/")
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Magic bytes -> media type, checked when a photo is served
+_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+# ---------------- Encoding helpers ----------------
+def decode_photo(data: str) -> bytes:
+    """Decode a base64 photo (plain or data: URL). Raises ValueError if invalid."""
+    data = (data or "").strip()
+    if data.startswith("data:"):
+        _, _, data = data.partition(",")
+    data = "".join(data.split())
+    if not data:
+        raise ValueError("Empty photo")
+    try:
+        return base64.b64decode(data, validate=True)
+    except binascii.Error:
+        raise ValueError("Invalid base64 photo")
+
+
+def photo_path(photo_hash: str) -> str:
+    """Location of a blob in the store (sharded by the first two hex chars)."""
+    return os.path.join(PHOTO_STORE_DIR, photo_hash[:2], photo_hash)
+
+
+def photo_url(photo_hash: Optional[str]) -> Optional[str]:
+    """Public URL for a stored photo, or None if there is no hash."""
+    if not photo_hash:
+        return None
+    return f"{PHOTO_BASE_URL}/photos/{photo_hash}"
+
+
+def media_type(path: str) -> str:
+    """Sniff the image type from the first bytes of a stored blob."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+    for signature, mime in _SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+# ---------------- Store ----------------
+def store_photo_bytes(content: bytes) -> str:
+    """Write bytes once under their SHA-256 and return the hash."""
+    photo_hash = hashlib.sha256(content).hexdigest()
+    path = photo_path(photo_hash)
+    if os.path.exists(path):
+        return photo_hash  # ✅ already stored (same photo, possibly another user)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return photo_hash
+
+
+def store_photo(data: str) -> str:
+    """Decode a base64 photo, store it and return its hash."""
+    return store_photo_bytes(decode_photo(data))
@@ -0,0 +1,16 @@
+"""
+Recount request_counters from document_requests (also runs in-app every
+COUNTER_RECONCILE_SECONDS). Safe to run while the API is serving.
+
+    python reconcile_counters.py
+"""
+import asyncio
+
+from counters import reconcile
+
+
+if __name__ == "__main__":
+    drift = asyncio.run(reconcile())
+    for (status, document_type), (stored, actual) in sorted(drift.items()):
+        print(f"⚠ {status} / {document_type}: counter {stored}, actual {actual}")
+    print(f"✅ Request counters reconciled ({len(drift)} bucket(s) fixed).")
@@ -0,0 +1,232 @@
+# resident_import.py
+"""
+Bulk resident import from a census export (CSV with a header row, or NDJSON).
+
+The input is read as a stream and handled in chunks of IMPORT_CHUNK_SIZE rows.
+Per chunk: validate and normalize every row, check contacts and names against
+an in-memory index of the rows seen so far in the file plus one IN query each
+against users, then insert the accepted rows with one executemany INSERT,
+their registration notifications with another, and commit. A bad row ends up
+in the error report with its line number; it never fails the rest.
+
+Used by POST /users/import and import_residents.py.
+"""
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import UserDB, name_key
+from outbox import add_notifications
+from response_cache import response_cache, USERS
+from routes.users import hash_password, normalize_contact
+from schemas import ImportReport, ImportRowError, ResidentImportRow
+
+load_dotenv()
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+# verify_password compares SHA-256 hex digests, which never equal this
+UNUSABLE_PASSWORD = "!"
+
+Record = Tuple[int, dict]  # (line number, raw fields)
+
+
+# ---------------- Parsing ----------------
+async def stream_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """UTF-8 (BOM tolerated) lines from a byte stream, without their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Rows keyed by the header row; a quoted field may span lines."""
+    header: Optional[List[str]] = None
+    record, start, number = "", 0, 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+            if not line.strip():
+                continue
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:  # inside a quoted field, keep reading
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield start, dict(zip(header, values))
+    if record:
+        yield start, {"__error__": "Unterminated quoted field"}
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield number, {"__error__": f"Invalid JSON: {e}"}
+            continue
+        yield number, value if isinstance(value, dict) else {"__error__": "Expected a JSON object"}
+
+
+PARSERS = {"csv": csv_records, "ndjson": ndjson_records}
+
+
+async def chunked(records: AsyncIterator[Record], size: int) -> AsyncIterator[List[Record]]:
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------- Validation ----------------
+def validate(raw: dict) -> Tuple[Optional[ResidentImportRow], List[str]]:
+    """The parsed row, or the reasons it was rejected."""
+    if "__error__" in raw:
+        return None, [raw["__error__"]]
+    # Empty CSV cells mean "not given", so optional columns fall back to their defaults
+    fields = {k: v for k, v in raw.items() if k and v not in ("", None)}
+    try:
+        return ResidentImportRow.model_validate(fields), []
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()]
+
+
+def row_values(row: ResidentImportRow, contact: str, key: str, status: str) -> dict:
+    """users INSERT values (Core: name_key is set here, the mapper event does not run)."""
+    return {
+        "first_name": row.firstName, "middle_name": row.middleName or None, "last_name": row.lastName,
+        "dob": row.dob, "gender": row.gender, "civil_status": row.civilStatus, "contact": contact,
+        "purok": row.purok, "barangay": row.barangay, "city": row.city, "province": row.province,
+        "postal_code": row.postalCode, "role": row.role, "status": status, "name_key": key,
+        "password": hash_password(row.password) if row.password else UNUSABLE_PASSWORD,
+    }
+
+
+# ---------------- Import ----------------
+class ResidentImporter:
+    """Imports chunks into one session, remembering contacts and names already seen in the file."""
+
+    def __init__(self, db, status: str = "Pending", dry_run: bool = False):
+        self.db = db
+        self.status = status
+        self.dry_run = dry_run
+        self.seen_contacts: Dict[str, int] = {}  # contact -> line it first appeared on
+        self.seen_names: Dict[str, int] = {}  # name_key -> line
+        self.total = 0
+        self.imported = 0
+        self.errors: List[ImportRowError] = []
+
+    def _fail(self, line: int, contact: Optional[str], *errors: str):
+        self.errors.append(ImportRowError(line=line, contact=contact, errors=list(errors)))
+
+    async def _existing(self, column, values: Iterable[str]) -> set:
+        values = list(values)
+        if not values:
+            return set()
+        return set((await self.db.scalars(select(column).where(column.in_(values)))).all())
+
+    async def add_chunk(self, records: List[Record]):
+        self.total += len(records)
+        accepted = []  # (line, values)
+        for line, raw in records:
+            row, errors = validate(raw)
+            if row is None:
+                self._fail(line, raw.get("contact") if isinstance(raw.get("contact"), str) else None, *errors)
+                continue
+            try:
+                contact = normalize_contact(row.contact)
+            except ValueError:
+                self._fail(line, row.contact, "Invalid contact number format")
+                continue
+            key = name_key(row.firstName, row.lastName)
+            if contact in self.seen_contacts:
+                self._fail(line, contact, f"Contact already in this file (line {self.seen_contacts[contact]})")
+                continue
+            if key in self.seen_names:
+                self._fail(line, contact, f"Same name already in this file (line {self.seen_names[key]})")
+                continue
+            self.seen_contacts[contact] = line
+            self.seen_names[key] = line
+            accepted.append((line, row_values(row, contact, key, self.status)))
+
+        await self._insert(accepted)
+
+    async def _insert(self, accepted: List[Tuple[int, dict]], retry: bool = True):
+        # Set-wise duplicate checks against the table: one IN query per key
+        taken_contacts = await self._existing(UserDB.contact, (v["contact"] for _, v in accepted))
+        taken_names = await self._existing(UserDB.name_key, (v["name_key"] for _, v in accepted))
+        rows = []
+        for line, values in accepted:
+            if values["contact"] in taken_contacts:
+                self._fail(line, values["contact"], "Contact already registered")
+            elif values["name_key"] in taken_names:
+                self._fail(line, values["contact"], "User with same name already registered")
+            else:
+                rows.append((line, values))
+
+        if self.dry_run:
+            self.imported += len(rows)  # would have been imported
+            return
+        if not rows:
+            return
+
+        try:
+            created = (await self.db.execute(
+                insert(UserDB).returning(UserDB.id, UserDB.first_name, UserDB.last_name, UserDB.role),
+                [values for _, values in rows],
+            )).all()
+            await add_notifications(self.db, [{
+                "user_id": user.id,
+                "title": "New User Registration",
+                "message": f"{user.first_name} {user.last_name} registered as {user.role}.",
+                "type": "registration",
+            } for user in created])
+            await self.db.commit()
+            await response_cache.invalidate(USERS)
+        except IntegrityError:
+            # Someone registered one of these contacts since the check: re-check once, then give up on the chunk
+            await self.db.rollback()
+            if retry:
+                return await self._insert(rows, retry=False)
+            for line, values in rows:
+                self._fail(line, values["contact"], "Conflicting registration, retry this row")
+            return
+        self.imported += len(created)
+
+    def report(self) -> ImportReport:
+        errors = sorted(self.errors, key=lambda e: e.line)
+        return ImportReport(total=self.total, imported=self.imported, failed=len(errors), dry_run=self.dry_run, errors=errors)
+
+
+async def import_residents(db, chunks: AsyncIterator[bytes], format: str, status: str = "Pending",
+                           dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Import a CSV/NDJSON byte stream; returns the per-row report. Commits once per chunk."""
+    importer = ResidentImporter(db, status, dry_run)
+    async for batch in chunked(PARSERS[format](stream_lines(chunks)), chunk_size):
+        await importer.add_chunk(batch)
+    return importer.report()
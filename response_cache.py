@@ -0,0 +1,183 @@
+# response_cache.py
+"""
+Cache of serialized JSON responses for hot read endpoints.
+
+Entries are grouped under tags ("users", "user:<id>", "document-requests").
+Every tag has a generation number that is part of the cache key, and writers
+invalidate a tag by bumping it after their commit. A reader takes the key
+before querying, so a response built from pre-commit data is stored under
+the old generation and never served again.
+
+RESPONSE_CACHE_BACKEND=memory keeps entries in each worker (invalidation is
+local, other workers catch up within RESPONSE_CACHE_TTL); =redis shares
+entries and generations through REDIS_URL; =none disables caching. Routes
+with conditional GET add their ETag to the key, so whatever the backend, a
+body is only served with the validators it was built from.
+"""
+import os
+from typing import Iterable, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from ttl_cache import TTLCache
+
+load_dotenv()
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory | redis | none
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+# ---------------- Backends ----------------
+class MemoryBackend:
+    """LRU + TTL entries in this process (ttl_cache.TTLCache)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+
+    async def generation(self, tag: str) -> int:
+        return self._generations.get(tag, 0)
+
+    async def bump(self, tag: str):
+        self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, body: bytes):
+        self._entries.set(key, body)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._entries.stats()}
+
+
+class RedisBackend:
+    """Entries with EX ttl (eviction follows the server's maxmemory-policy), generations in one hash."""
+
+    GENERATIONS = "response-cache:generations"
+
+    def __init__(self, url: str, ttl: float):
+        import redis.asyncio as redis  # only needed for this backend
+
+        self._redis = redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+
+    async def generation(self, tag: str) -> int:
+        return int(await self._redis.hget(self.GENERATIONS, tag) or 0)
+
+    async def bump(self, tag: str):
+        await self._redis.hincrby(self.GENERATIONS, tag, 1)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(f"response-cache:{key}")
+
+    async def set(self, key: str, body: bytes):
+        await self._redis.set(f"response-cache:{key}", body, ex=self._ttl)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+# ---------------- Cache ----------------
+class ResponseCache:
+    def __init__(self, backend=None):
+        self.backend = backend  # None = caching disabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def key(self, tag: str, route: str, params: Iterable[Tuple[str, str]] = ()) -> Optional[str]:
+        """Cache key for `route` with query `params`, under the current generation of `tag`."""
+        if self.backend is None:
+            return None
+        try:
+            generation = await self.backend.generation(tag)
+        except Exception as e:
+            self._failed(e)
+            return None
+        query = "&".join(f"{k}={v}" for k, v in sorted(params))
+        return f"{tag}@{generation}|{route}?{query}"
+
+    async def get(self, key: Optional[str]) -> Optional[Response]:
+        if key is None:
+            return None
+        try:
+            body = await self.backend.get(key)
+        except Exception as e:
+            self._failed(e)
+            return None
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Response(content=body, media_type="application/json")
+
+    async def store(self, key: Optional[str], value, model, exclude_unset: bool = False) -> Response:
+        """Serialize `value` like FastAPI's response_model would, cache the bytes and return them."""
+        adapter = TypeAdapter(model)
+        body = adapter.dump_json(
+            adapter.validate_python(value, from_attributes=True), by_alias=True, exclude_unset=exclude_unset
+        )
+        return await self.store_body(key, body)
+
+    async def store_body(self, key: Optional[str], body: bytes) -> Response:
+        """Cache an already encoded JSON body (fast_json path) and return it."""
+        if key is not None:
+            try:
+                await self.backend.set(key, body)
+            except Exception as e:
+                self._failed(e)
+        return Response(content=body, media_type="application/json")
+
+    async def invalidate(self, *tags: str):
+        """Drop every entry under `tags`; call after the commit that changed them."""
+        if self.backend is None:
+            return
+        for tag in tags:
+            try:
+                await self.backend.bump(tag)
+                self.invalidations += 1
+            except Exception as e:
+                self._failed(e)
+
+    def _failed(self, error: Exception):
+        # A cache outage degrades to uncached reads instead of failing requests
+        self.errors += 1
+        print(f"⚠ Response cache error: {error}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **(self.backend.stats() if self.backend is not None else {"backend": "none"}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return ResponseCache(MemoryBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL))
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return ResponseCache(RedisBackend(REDIS_URL, RESPONSE_CACHE_TTL))
+    if RESPONSE_CACHE_BACKEND != "none":
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {RESPONSE_CACHE_BACKEND}")
+    return ResponseCache()
+
+
+response_cache = create_response_cache()
+
+
+# ---------------- Tags ----------------
+USERS = "users"
+DOCUMENT_REQUESTS = "document-requests"
+
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
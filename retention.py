@@ -0,0 +1,206 @@
+# retention.py
+"""
+Notification retention: keeps the notifications table down to recent rows.
+
+A sweep walks notifications oldest first on (created_at, id) and moves
+expired ones to notifications_archive in batches of RETENTION_BATCH_SIZE:
+one short transaction per batch (INSERT … SELECT into the archive, then
+DELETE), with a RETENTION_PAUSE_SECONDS pause in between so request
+traffic never queues behind it. Rows are locked FOR UPDATE SKIP LOCKED, so
+several workers can run the sweep at once.
+
+Expired means older than NOTIFICATION_RETENTION_DAYS and read, or older
+than NOTIFICATION_UNREAD_RETENTION_DAYS whatever its state (0 keeps unread
+rows). Notifications still in the outbox or with a Pending SMS delivery
+stay until those are done. Archived rows are dropped for good
+NOTIFICATION_ARCHIVE_DAYS after they were archived (0 keeps them).
+
+archived_at is stamped per batch (not per sweep) because it doubles as the
+tombstone time: GET /notifications/users/{id}/changes lists the ids archived
+since a client's sync token, so their archived_at must not predate a token
+handed out while the sweep was running.
+
+Runs every RETENTION_INTERVAL_SECONDS in the app, or once from the shell:
+
+    python retention.py            # archive and purge now
+    python retention.py --dry-run  # only count what would go
+"""
+import argparse
+import asyncio
+import os
+import traceback
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select, tuple_
+
+from database import AsyncSessionLocal
+from models import NotificationArchiveDB, NotificationDB, NotificationDeliveryDB, NotificationOutboxDB
+from statuses import DeliveryStatus
+
+load_dotenv()
+NOTIFICATION_RETENTION_DAYS = float(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))  # read notifications
+NOTIFICATION_UNREAD_RETENTION_DAYS = float(os.getenv("NOTIFICATION_UNREAD_RETENTION_DAYS", "365"))  # 0 = keep
+NOTIFICATION_ARCHIVE_DAYS = float(os.getenv("NOTIFICATION_ARCHIVE_DAYS", "0"))  # 0 = keep forever
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", "0.05"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))  # 0 = never
+
+ARCHIVED_COLUMNS = ("id", "title", "message", "type", "is_read", "created_at", "updated_at", "user_id")
+
+
+# ---------------- Policy ----------------
+def expired_clause(now: datetime):
+    """WHERE clause for notifications past their retention at `now`."""
+    old = NotificationDB.created_at < now - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+    if NOTIFICATION_UNREAD_RETENTION_DAYS:
+        unread_cutoff = now - timedelta(days=NOTIFICATION_UNREAD_RETENTION_DAYS)
+        expired = and_(old, or_(NotificationDB.is_read == True, NotificationDB.created_at < unread_cutoff))
+    else:
+        expired = and_(old, NotificationDB.is_read == True)
+    in_flight = or_(
+        exists().where(NotificationOutboxDB.notification_id == NotificationDB.id),
+        exists().where(NotificationDeliveryDB.notification_id == NotificationDB.id,
+                       NotificationDeliveryDB.status == DeliveryStatus.PENDING),
+    )
+    return and_(expired, ~in_flight)
+
+
+def archive_expired_clause(now: datetime):
+    return NotificationArchiveDB.archived_at < now - timedelta(days=NOTIFICATION_ARCHIVE_DAYS)
+
+
+# ---------------- Sweep ----------------
+async def archive_batch(db, now: datetime, after: Optional[tuple], limit: int):
+    """Move one batch to the archive and commit; returns (rows moved, (created_at, id) of the last one)."""
+    stmt = select(NotificationDB.id, NotificationDB.created_at).where(expired_clause(now))
+    if after is not None:
+        stmt = stmt.where(tuple_(NotificationDB.created_at, NotificationDB.id) > after)
+    rows = (await db.execute(
+        stmt.order_by(NotificationDB.created_at, NotificationDB.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=NotificationDB)  # workers split the sweep
+    )).all()
+    if not rows:
+        return 0, after
+
+    ids = [r.id for r in rows]
+    columns = [getattr(NotificationDB, name) for name in ARCHIVED_COLUMNS]
+    archived_at = literal(datetime.utcnow(), NotificationArchiveDB.archived_at.type)  # tombstone time, see above
+    await db.execute(
+        insert(NotificationArchiveDB).from_select(
+            ARCHIVED_COLUMNS + ("archived_at",),
+            select(*columns, archived_at).where(NotificationDB.id.in_(ids)),
+        )
+    )
+    # SQLite does not enforce ON DELETE CASCADE here, so finished deliveries go explicitly
+    await db.execute(delete(NotificationDeliveryDB).where(NotificationDeliveryDB.notification_id.in_(ids)))
+    await db.execute(
+        delete(NotificationDB).where(NotificationDB.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return len(ids), (rows[-1].created_at, rows[-1].id)
+
+
+async def purge_archive_batch(db, now: datetime, limit: int) -> int:
+    """Delete one batch of archived rows past NOTIFICATION_ARCHIVE_DAYS and commit."""
+    ids = (await db.scalars(
+        select(NotificationArchiveDB.id).where(archive_expired_clause(now))
+        .order_by(NotificationArchiveDB.archived_at, NotificationArchiveDB.id)
+        .limit(limit)
+    )).all()
+    if ids:
+        await db.execute(delete(NotificationArchiveDB).where(NotificationArchiveDB.id.in_(ids)))
+        await db.commit()
+    return len(ids)
+
+
+async def sweep(batch_size: int = RETENTION_BATCH_SIZE, pause: float = RETENTION_PAUSE_SECONDS) -> Dict[str, int]:
+    """Archive every expired notification, then purge the expired archive; one transaction per batch."""
+    now = datetime.utcnow()
+    archived = purged = 0
+    async with AsyncSessionLocal() as db:
+        after = None
+        while True:
+            moved, after = await archive_batch(db, now, after, batch_size)
+            archived += moved
+            if moved < batch_size:
+                break
+            await asyncio.sleep(pause)
+        while NOTIFICATION_ARCHIVE_DAYS:
+            deleted = await purge_archive_batch(db, now, batch_size)
+            purged += deleted
+            if deleted < batch_size:
+                break
+            await asyncio.sleep(pause)
+    return {"archived": archived, "purged": purged}
+
+
+async def retention_stats() -> Dict[str, int]:
+    """Rows in each table and how many a sweep would move or purge right now."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        stats = {
+            "notifications": await db.scalar(select(func.count(NotificationDB.id))),
+            "archived": await db.scalar(select(func.count(NotificationArchiveDB.id))),
+            "to_archive": await db.scalar(select(func.count(NotificationDB.id)).where(expired_clause(now))),
+            "to_purge": 0,
+        }
+        if NOTIFICATION_ARCHIVE_DAYS:
+            stats["to_purge"] = await db.scalar(
+                select(func.count(NotificationArchiveDB.id)).where(archive_expired_clause(now))
+            )
+    return stats
+
+
+class RetentionJob:
+    """Background task that runs sweep() every `interval` seconds."""
+
+    def __init__(self, interval: float = RETENTION_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await sweep()
+                if result["archived"] or result["purged"]:
+                    print(f"✅ Notification retention: {result['archived']} archived, {result['purged']} purged")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                print("⚠ Notification retention failed, will retry")
+                traceback.print_exc()
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+retention_job = RetentionJob()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive expired notifications and purge the expired archive.")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived or purged")
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.dry_run:
+        stats = asyncio.run(retention_stats())
+        print(f"✅ {stats['to_archive']}/{stats['notifications']} notifications would be archived, "
+              f"{stats['to_purge']}/{stats['archived']} archived ones purged.")
+    else:
+        result = asyncio.run(sweep(args.batch_size))
+        print(f"🎉 {result['archived']} notifications archived, {result['purged']} purged.")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import Principal, get_current_user, issue_token, TOKEN_TTL_SECONDS
+from database import get_db
+from routes.users import authenticate
+from schemas import UserLogin, TokenResponse, PrincipalResponse
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+# ---------------------------
+# Issue a session token
+# ---------------------------
+@router.post("/login", response_model=TokenResponse)
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await authenticate(db, credentials)
+    return TokenResponse(
+        access_token=issue_token(db_user.id),
+        expires_in=TOKEN_TTL_SECONDS,
+        user=PrincipalResponse.model_validate(db_user),
+    )
+
+
+# ---------------------------
+# Current user
+# ---------------------------
+@router.get("/me", response_model=PrincipalResponse)
+async def me(current_user: Principal = Depends(get_current_user)):
+    return current_user
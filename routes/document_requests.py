@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
 from typing import Optional, List
+from collections import Counter, defaultdict
 from datetime import datetime
 import traceback
 
 from database import get_db
-from models import DocumentRequestDB, UserDB, NotificationDB
+from photos import store_photo, photo_url
+from pagination import page_stmt, paginate, paginate_rows, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from projection import parse_fields, load_only_columns, project, selected_columns, project_rows
+from models import DocumentRequestDB, UserDB, RequestCounterDB
+from outbox import add_notification, add_notifications
+import counters
+from response_cache import response_cache, DOCUMENT_REQUESTS
+from conditional import make_validators, not_modified, with_validators
+from sync import fetch_changes
+from fast_json import FAST_JSON_RESPONSES, dumps
+from state_machine import get_status_machine
+from statuses import RequestStatus, UserStatus
 from schemas import (
     DocumentRequest, DocumentRequestUpdate, DocumentRequestResponse,
-    UserInfoResponse, StatusUpdate
+    DocumentRequestListItem, DocumentRequestPage, DocumentRequestChanges, UserInfoResponse, StatusUpdate,
+    BulkStatusUpdate, BulkStatusResult, BulkStatusResponse, RequestStatsBucket, RequestStatsResponse
 )
 
 router = APIRouter(prefix="/document-requests", tags=["document-requests"])
@@ -34,69 +49,95 @@ def safe_user_response(user: Optional[UserDB]) -> Optional[UserInfoResponse]:
         firstName=user.first_name or "",
         middleName=user.middle_name,
         lastName=user.last_name or "",
-        photo=user.photo
+        photo=user.photo_url
     )
 
 
+# API field -> (columns to load, value getter); drives both responses and ?fields=
+REQUEST_FIELDS = {
+    "id": (["id"], lambda r: r.id),
+    "documentType": (["document_type"], lambda r: r.document_type or "Unknown"),
+    "purpose": (["purpose"], lambda r: r.purpose or ""),
+    "copies": (["copies"], lambda r: r.copies or 1),
+    "requirements": (["requirements"], lambda r: r.requirements or ""),
+    "photo": (["photo_hash", "photo"], lambda r: r.photo_url),
+    "contact": (["contact"], lambda r: r.contact or ""),
+    "notes": (["notes"], lambda r: r.notes or ""),
+    "status": (["status"], lambda r: r.status or "Pending"),
+    "action": (["action"], lambda r: r.action or "Review"),
+    "user_id": (["user_id"], lambda r: r.user_id),
+    "pickup_date": (["pickup_date"], lambda r: r.pickup_date),
+    "created_at": (["created_at"], lambda r: r.created_at),
+    "updated_at": (["updated_at"], lambda r: r.updated_at),
+    "user": (["user_id"], lambda r: safe_user_response(getattr(r, "user", None))),
+}
+
+# Only what UserInfoResponse needs from the joined user row
+USER_INFO_COLUMNS = (UserDB.first_name, UserDB.middle_name, UserDB.last_name, UserDB.photo_hash)
+
+
+# ---------------- Fast path (FAST_JSON_RESPONSES) ----------------
+USER_INFO_LABELS = tuple(column.label(f"user_{column.key}") for column in USER_INFO_COLUMNS)
+
+
+def row_user_info(r) -> Optional[dict]:
+    """safe_user_response() as a dict (by alias) from the joined user_* columns."""
+    if r.user_first_name is None:  # outer join found no user
+        return None
+    return {
+        "first_name": r.user_first_name or "",
+        "middle_name": r.user_middle_name,
+        "last_name": r.user_last_name or "",
+        "photo": photo_url(r.user_photo_hash) if r.user_photo_hash else None,
+    }
+
+
+# REQUEST_FIELDS getters read plain attributes, so they work on Row tuples too,
+# except the two that need ORM objects
+REQUEST_ROW_GETTERS = {
+    **{name: getter for name, (_, getter) in REQUEST_FIELDS.items()},
+    "photo": lambda r: photo_url(r.photo_hash) if r.photo_hash else r.photo,
+    "user": row_user_info,
+}
+
+
 def document_request_response(db_request: DocumentRequestDB) -> DocumentRequestResponse:
     """Convert DB model into API-safe schema."""
-    return DocumentRequestResponse(
-        id=db_request.id,
-        documentType=db_request.document_type or "Unknown",
-        purpose=db_request.purpose or "",
-        copies=db_request.copies or 1,
-        requirements=db_request.requirements or "",
-        photo=db_request.photo or None,
-        contact=db_request.contact or "",
-        notes=db_request.notes or "",
-        status=db_request.status or "Pending",
-        action=db_request.action or "Review",
-        user_id=db_request.user_id,
-        pickup_date=db_request.pickup_date,
-        created_at=db_request.created_at,
-        updated_at=db_request.updated_at,
-        user=safe_user_response(getattr(db_request, "user", None)),
-    )
+    return DocumentRequestResponse(**project(db_request, REQUEST_FIELDS))
 
 
-def get_request_by_id(db: Session, request_id: int, include_deleted: bool = False) -> DocumentRequestDB:
+async def get_request_by_id(db: AsyncSession, request_id: int, include_deleted: bool = False) -> DocumentRequestDB:
     """Fetch request by ID, raise 404 if not found."""
-    query = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(DocumentRequestDB.id == request_id)
+    stmt = select(DocumentRequestDB).options(
+        joinedload(DocumentRequestDB.user).load_only(*USER_INFO_COLUMNS)
+    ).where(DocumentRequestDB.id == request_id)
     if not include_deleted:
-        query = query.filter(DocumentRequestDB.is_deleted == False)
-    db_request = query.first()
+        stmt = stmt.where(DocumentRequestDB.is_deleted == False)
+    db_request = await db.scalar(stmt)
     if not db_request:
         raise HTTPException(status_code=404, detail="Request not found")
     return db_request
 
 
-def create_notification(db: Session, user_id: int, title: str, message: str):
-    """Helper to create a notification."""
+async def store_request_photo(photo: Optional[str]) -> Optional[str]:
+    """Store an uploaded base64 photo, raise 400 if it cannot be decoded."""
+    if not photo or not photo.strip():
+        return None
     try:
-        notif = NotificationDB(
-            user_id=user_id,
-            title=title,
-            message=message,
-            is_read=False,
-            timestamp=datetime.utcnow()
-        )
-        db.add(notif)
-        db.commit()
-    except Exception:
-        db.rollback()
-        print("⚠ Failed to create notification")
-        traceback.print_exc()
+        return await run_in_threadpool(store_photo, photo)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid photo data")
 
 
 # ---------------- Create Request ----------------
 @router.post("/", response_model=DocumentRequestResponse, status_code=status.HTTP_201_CREATED)
-def create_request(request: DocumentRequest, db: Session = Depends(get_db)):
+async def create_request(request: DocumentRequest, db: AsyncSession = Depends(get_db)):
     try:
         contact = normalize_contact(request.contact)
-        user = db.query(UserDB).filter(
+        user = await db.scalar(select(UserDB).where(
             UserDB.contact == contact,
-            func.lower(UserDB.status) == "approved"
-        ).first()
+            UserDB.status == UserStatus.APPROVED
+        ))
 
         if not user:
             raise HTTPException(
@@ -104,65 +145,158 @@ def create_request(request: DocumentRequest, db: Session = Depends(get_db)):
                 detail=f"User with contact '{contact}' not found or not approved."
             )
 
+        now = datetime.utcnow()
         db_request = DocumentRequestDB(
             document_type=(request.documentType or "Unknown").strip(),
             purpose=(request.purpose or "").strip(),
             copies=request.copies or 1,
             requirements=(request.requirements or "").strip(),
-            photo=(request.photo or "").strip() if request.photo else None,
+            photo_hash=await store_request_photo(request.photo),
             contact=contact,
             notes=(request.notes or "").strip(),
             status="Pending",
             action="Review",
-            user_id=user.id,
+            user=user,
             is_deleted=False,
-            created_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
 
         db.add(db_request)
-        db.commit()
-        db.refresh(db_request)
 
-        # 🔔 Create notification for new request
-        create_notification(db, user.id, "New Document Request Submitted",
-                            f"Your request for {db_request.document_type} has been submitted and is now under review.")
+        # 🔔 Create notification for new request (same transaction)
+        add_notification(db, user.id, "New Document Request Submitted",
+                         f"Your request for {db_request.document_type} has been submitted and is now under review.")
+        await counters.record(db, None, counters.counter_key(db_request))
+        await db.commit()
+        await response_cache.invalidate(DOCUMENT_REQUESTS)
 
         return document_request_response(db_request)
 
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
 # ---------------- Get Requests ----------------
-@router.get("/", response_model=List[DocumentRequestResponse], status_code=status.HTTP_200_OK)
-def get_requests(
+def request_filters(contact: Optional[str] = None, status: Optional[str] = None, include_deleted: bool = False) -> list:
+    """WHERE clauses for the GET /document-requests/ query params."""
+    filters = []
+    if not include_deleted:
+        filters.append(DocumentRequestDB.is_deleted == False)
+
+    if contact:
+        filters.append(DocumentRequestDB.contact == normalize_contact(contact))
+
+    if status:
+        code = RequestStatus.from_label(status)
+        if code is None:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        filters.append(DocumentRequestDB.status == code)
+    return filters
+
+
+def list_requests_stmt(
+    selected: List[str], contact: Optional[str] = None, status: Optional[str] = None, include_deleted: bool = False
+):
+    """SELECT behind GET /document-requests/ (also EXPLAINed by check_query_plans.py)."""
+    stmt = select(DocumentRequestDB).options(
+        load_only_columns(DocumentRequestDB, REQUEST_FIELDS, selected, extra=("created_at",))
+    )
+    if "user" in selected:
+        stmt = stmt.options(joinedload(DocumentRequestDB.user).load_only(*USER_INFO_COLUMNS))
+    return stmt.where(*request_filters(contact, status, include_deleted))
+
+
+def list_rows_stmt(
+    selected: List[str], contact: Optional[str] = None, status: Optional[str] = None, include_deleted: bool = False
+):
+    """list_requests_stmt() as a plain column SELECT for the fast path."""
+    stmt = select(*selected_columns(DocumentRequestDB, REQUEST_FIELDS, selected, extra=("id", "created_at")))
+    if "user" in selected:
+        stmt = stmt.add_columns(*USER_INFO_LABELS).outerjoin(DocumentRequestDB.user)
+    return stmt.where(*request_filters(contact, status, include_deleted))
+
+
+def list_state_stmt(
+    contact: Optional[str] = None, status: Optional[str] = None, include_deleted: bool = False,
+    cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    (id, updated_at) of the rows on the requested page (+1, like the page
+    itself) and the newest user change (items embed user info). The same
+    keyset range as the page and an index-only max(), so a revalidation costs
+    the same on page 1 and page N; a row entering, leaving or changing on the
+    page changes the ETag.
+    """
+    stmt = select(
+        DocumentRequestDB.id,
+        DocumentRequestDB.updated_at,
+        select(func.max(UserDB.updated_at)).scalar_subquery().label("users_changed"),
+    ).where(*request_filters(contact, status, include_deleted))
+    return page_stmt(stmt, DocumentRequestDB.created_at, DocumentRequestDB.id, cursor, limit)
+
+
+@router.get("/", response_model=DocumentRequestPage, response_model_exclude_unset=True, status_code=status.HTTP_200_OK)
+async def get_requests(
+    request: Request,
     contact: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     include_deleted: bool = Query(False, description="Include soft-deleted requests"),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,documentType,status"),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        query = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user))
-        if not include_deleted:
-            query = query.filter(DocumentRequestDB.is_deleted == False)
-
-        if contact:
-            query = query.filter(DocumentRequestDB.contact == normalize_contact(contact))
-
-        if status:
-            query = query.filter(func.lower(DocumentRequestDB.status) == status.strip().lower())
+        # --- Conditional GET: answer 304 before loading or serializing any row ---
+        page_state = (await db.execute(
+            list_state_stmt(contact, status, include_deleted, cursor, limit)
+        )).all()
+        # No Last-Modified: see conditional.py
+        validators = make_validators(
+            "GET /document-requests/", request.query_params.multi_items(),
+            *(f"{row.id}@{row.updated_at}" for row in page_state),
+            page_state[0].users_changed if page_state else None,
+        )
+        unchanged = not_modified(request, validators)
+        if unchanged is not None:
+            return unchanged
 
-        requests = query.order_by(DocumentRequestDB.created_at.desc()).all()
-        return [document_request_response(r) for r in requests]
+        # Keyed by the ETag too, so a cached body only ever goes out with the validators it was built from
+        cache_key = await response_cache.key(
+            DOCUMENT_REQUESTS, "GET /document-requests/", [*request.query_params.multi_items(), ("etag", validators.etag)]
+        )
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return with_validators(cached, validators)
+
+        selected = parse_fields(fields, REQUEST_FIELDS)
+        if FAST_JSON_RESPONSES:
+            rows, next_cursor = await paginate_rows(
+                db, list_rows_stmt(selected, contact, status, include_deleted),
+                DocumentRequestDB.created_at, DocumentRequestDB.id, cursor, limit,
+            )
+            body = dumps({"items": project_rows(rows, REQUEST_ROW_GETTERS, selected), "next_cursor": next_cursor})
+            return with_validators(await response_cache.store_body(cache_key, body), validators)
+
+        stmt = list_requests_stmt(selected, contact, status, include_deleted)
+        requests, next_cursor = await paginate(db, stmt, DocumentRequestDB.created_at, DocumentRequestDB.id, cursor, limit)
+        page = DocumentRequestPage(
+            items=[DocumentRequestListItem(**project(r, REQUEST_FIELDS, selected)) for r in requests],
+            next_cursor=next_cursor,
+        )
+        return with_validators(await response_cache.store(cache_key, page, DocumentRequestPage, exclude_unset=True), validators)
 
+    except HTTPException:
+        raise
     except SQLAlchemyError:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Database error occurred")
@@ -171,140 +305,250 @@ def get_requests(
         raise HTTPException(status_code=500, detail="Failed to fetch document requests")
 
 
+# ---------------- Dashboard Stats ----------------
+@router.get("/stats", response_model=RequestStatsResponse)
+async def get_request_stats(db: AsyncSession = Depends(get_db)):
+    """Live request counts by status and document type, read from request_counters (no table scan)."""
+    rows = (await db.scalars(
+        select(RequestCounterDB).where(RequestCounterDB.count > 0)
+        .order_by(RequestCounterDB.status, RequestCounterDB.document_type)
+    )).all()
+
+    by_status = {s.label: 0 for s in RequestStatus}
+    by_document_type = defaultdict(int)
+    for row in rows:
+        by_status[row.status] += row.count
+        by_document_type[row.document_type] += row.count
+
+    return RequestStatsResponse(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_document_type=dict(by_document_type),
+        buckets=[RequestStatsBucket(status=r.status, documentType=r.document_type, count=r.count) for r in rows],
+    )
+
+
+# ---------------- Delta Sync ----------------
+@router.get("/changes", response_model=DocumentRequestChanges, response_model_exclude_unset=True)
+async def get_request_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    contact: Optional[str] = Query(None),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,documentType,status"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Requests changed since `since`, with soft-deleted ones reduced to tombstones (ids)."""
+    selected = parse_fields(fields, REQUEST_FIELDS)
+    stmt = select(DocumentRequestDB).options(
+        load_only_columns(DocumentRequestDB, REQUEST_FIELDS, selected, extra=("updated_at", "is_deleted"))
+    )
+    if "user" in selected:
+        stmt = stmt.options(joinedload(DocumentRequestDB.user).load_only(*USER_INFO_COLUMNS))
+    if contact:
+        stmt = stmt.where(DocumentRequestDB.contact == normalize_contact(contact))
+
+    rows, next_token, has_more = await fetch_changes(
+        db, stmt, DocumentRequestDB.updated_at, DocumentRequestDB.id, since, limit
+    )
+    return DocumentRequestChanges(
+        items=[DocumentRequestListItem(**project(r, REQUEST_FIELDS, selected)) for r in rows if not r.is_deleted],
+        deleted=[r.id for r in rows if r.is_deleted],
+        next_token=next_token,
+        has_more=has_more,
+    )
+
+
+# ---------------- Status Transitions ----------------
+def status_notification(user_id: int, document_type: str, new_status: str) -> dict:
+    return {
+        "user_id": user_id,
+        "title": f"Request {new_status}",
+        "message": f"Your document request for {document_type} is now '{new_status}'.",
+        "type": "request_status",  # texted to the resident (delivery.DELIVERY_SMS_TYPES)
+    }
+
+
 # ---------------- Update Request Status ----------------
 @router.post("/status", response_model=DocumentRequestResponse)
-def update_request_status(payload: StatusUpdate = Body(...), db: Session = Depends(get_db)):
+async def update_request_status(payload: StatusUpdate = Body(...), db: AsyncSession = Depends(get_db)):
     try:
-        db_request = get_request_by_id(db, payload.id)
-        old_status = db_request.status
-
-        # --- Status logic ---
-        match payload.status:
-            case "Returned":
-                db_request.status = "Returned"
-                db_request.notes = payload.notes or "Request returned for correction"
-                db_request.action = payload.action or "Update Request"
-
-            case "Rejected":
-                db_request.status = "Rejected"
-                db_request.notes = payload.notes or "Request rejected"
-                db_request.action = payload.action or "Reject"
-
-            case "Approved" | "For Print" | "Completed":
-                db_request.status = payload.status
-                db_request.action = payload.action or "Review"
-                db_request.notes = ""
-
-            case "For Pickup":
-                db_request.status = "For Pickup"
-                db_request.action = payload.action or "Pickup"
-                db_request.notes = ""
-                db_request.pickup_date = datetime.utcnow()
-
-            case "Pending":
-                if old_status != "Returned":
-                    raise HTTPException(status_code=400, detail="Only Returned requests can be resubmitted.")
-                db_request.status = "Pending"
-                db_request.action = payload.action or "Resubmitted"
-                db_request.notes = ""
-
-            case _:
-                raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
+        db_request = await get_request_by_id(db, payload.id)
+        machine = await get_status_machine(db)
+        now = datetime.utcnow()
 
-        db_request.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_request)
+        # --- Status logic (request_status_transitions) ---
+        values = machine.resolve(db_request.status, payload.status, payload.action, payload.notes, now)
+        old_key = counters.counter_key(db_request)
+        for column, value in values.items():
+            setattr(db_request, column, value)
+        db_request.updated_at = now
 
         # 🔔 Notify user of status change
-        create_notification(
-            db,
-            db_request.user_id,
-            f"Request {db_request.status}",
-            f"Your document request for {db_request.document_type} is now '{db_request.status}'."
-        )
+        add_notification(db, **status_notification(db_request.user_id, db_request.document_type, db_request.status))
+        await counters.record(db, old_key, counters.counter_key(db_request))
+        await db.commit()
+        await response_cache.invalidate(DOCUMENT_REQUESTS)
 
         return document_request_response(db_request)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error updating request: {str(e)}")
 
 
+# ---------------- Bulk Status Update ----------------
+@router.post("/status/bulk", response_model=BulkStatusResponse)
+async def bulk_update_request_status(payload: BulkStatusUpdate = Body(...), db: AsyncSession = Depends(get_db)):
+    """
+    Apply many status changes in one transaction: one SELECT, one UPDATE per
+    distinct set of new values, one notification insert. Invalid items are
+    reported per item and do not block the rest.
+    """
+    try:
+        ids = {item.id for item in payload.items}
+        rows = (await db.execute(
+            select(DocumentRequestDB.id, DocumentRequestDB.status, DocumentRequestDB.document_type, DocumentRequestDB.user_id)
+            .where(DocumentRequestDB.id.in_(ids), DocumentRequestDB.is_deleted == False)
+        )).all()
+        current = {row.id: row for row in rows}
+        statuses = {row.id: row.status for row in rows}
+        machine = await get_status_machine(db)
+
+        now = datetime.utcnow()
+        results: List[BulkStatusResult] = []
+        final_values = {}  # request id -> values of its last successful transition
+        notifications = []
+
+        for item in payload.items:
+            if item.id not in current:
+                results.append(BulkStatusResult(id=item.id, success=False, detail="Request not found"))
+                continue
+            try:
+                values = machine.resolve(statuses[item.id], item.status, item.action, item.notes, now)
+            except HTTPException as e:
+                results.append(BulkStatusResult(id=item.id, success=False, detail=e.detail))
+                continue
+
+            statuses[item.id] = values["status"]
+            final_values[item.id] = {**final_values.get(item.id, {}), **values}
+            notifications.append(status_notification(current[item.id].user_id, current[item.id].document_type, values["status"]))
+            results.append(BulkStatusResult(id=item.id, success=True, status=values["status"]))
+
+        # --- Set-based UPDATEs: one per distinct set of new values ---
+        groups = defaultdict(list)
+        for request_id, values in final_values.items():
+            groups[tuple(sorted(values.items()))].append(request_id)
+        for values, request_ids in groups.items():
+            await db.execute(
+                update(DocumentRequestDB)
+                .where(DocumentRequestDB.id.in_(request_ids))
+                .values(**dict(values), updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+        # 🔔 One bulk insert for every status-change notification
+        await add_notifications(db, notifications)
+
+        deltas = Counter()
+        for request_id, values in final_values.items():
+            row = current[request_id]
+            counters.move(deltas, (row.status, row.document_type), (values["status"], row.document_type))
+        await counters.apply(db, deltas)
+        await db.commit()
+        await response_cache.invalidate(DOCUMENT_REQUESTS)
+
+        return BulkStatusResponse(updated=len(final_values), results=results)
+
+    except SQLAlchemyError:
+        await db.rollback()
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Database error occurred")
+
+
 # ---------------- Update Request Details (User Resubmit) ----------------
 @router.post("/{request_id}/update", response_model=DocumentRequestResponse)
-def update_request_details(request_id: int, payload: DocumentRequestUpdate = Body(...), db: Session = Depends(get_db)):
+async def update_request_details(request_id: int, payload: DocumentRequestUpdate = Body(...), db: AsyncSession = Depends(get_db)):
     try:
-        db_request = get_request_by_id(db, request_id)
+        db_request = await get_request_by_id(db, request_id)
 
         if db_request.status != "Returned":
             raise HTTPException(status_code=400, detail="Only Returned requests can be updated by user.")
+        old_key = counters.counter_key(db_request)
 
         # Update only provided fields
-        for field in ["documentType", "purpose", "copies", "requirements", "photo", "notes"]:
+        for field in ["documentType", "purpose", "copies", "requirements", "notes"]:
             value = getattr(payload, field, None)
             if value is not None:
                 setattr(db_request, field.lower() if field != "documentType" else "document_type", value.strip())
 
+        if payload.photo is not None:
+            db_request.photo_hash = await store_request_photo(payload.photo)
+            db_request.photo = None
+
         db_request.status = "Pending"
         db_request.action = "Resubmitted"
         db_request.updated_at = datetime.utcnow()
 
-        db.commit()
-        db.refresh(db_request)
-
         # 🔔 Notify secretary of resubmission
-        create_notification(db, db_request.user_id,
-                            "Request Resubmitted",
-                            f"{db_request.document_type} request was updated and resubmitted for review.")
+        add_notification(db, db_request.user_id,
+                         "Request Resubmitted",
+                         f"{db_request.document_type} request was updated and resubmitted for review.")
+        await counters.record(db, old_key, counters.counter_key(db_request))
+        await db.commit()
+        await response_cache.invalidate(DOCUMENT_REQUESTS)
 
         return document_request_response(db_request)
 
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
 # ---------------- Soft Delete Request ----------------
 @router.delete("/{request_id}", status_code=status.HTTP_200_OK)
-def soft_delete_request(request_id: int, db: Session = Depends(get_db)):
+async def soft_delete_request(request_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        db_request = get_request_by_id(db, request_id)
+        db_request = await get_request_by_id(db, request_id)
 
         if db_request.is_deleted:
             raise HTTPException(status_code=400, detail="Request already deleted.")
 
+        old_key = counters.counter_key(db_request)
         db_request.is_deleted = True
-        db_request.deleted_at = datetime.utcnow()
+        db_request.deleted_at = db_request.updated_at = datetime.utcnow()  # updated_at: tombstone for /changes
         db_request.status = "Cancelled"
 
-        db.commit()
-        db.refresh(db_request)
-
         # 🔔 Notify user of deletion
-        create_notification(
+        add_notification(
             db,
             db_request.user_id,
             "Request Cancelled",
-            f"Your request for {db_request.document_type} has been cancelled."
+            f"Your request for {db_request.document_type} has been cancelled.",
+            type="request_status",
         )
+        await counters.record(db, old_key, None)
+        await db.commit()
+        await response_cache.invalidate(DOCUMENT_REQUESTS)
 
         return {"message": f"Request {request_id} soft deleted successfully"}
 
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends
+
+from auth import principal_cache, require_staff
+from database import pool_stats
+from delivery import delivery_stats, requeue_dead
+from retention import retention_stats
+from response_cache import response_cache
+
+# ✅ Telemetry and ops actions: staff or INTERNAL_API_TOKEN only
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_staff)])
+
+
+# ---------------------------
+# Connection pool telemetry
+# ---------------------------
+@router.get("/pool-stats")
+def get_pool_stats():
+    """Checkout wait times, in-use connections and overflow per engine."""
+    return pool_stats()
+
+
+# ---------------------------
+# Cache telemetry
+# ---------------------------
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Hit/miss counters of the response cache and the principal cache."""
+    return {"responses": response_cache.stats(), "principals": principal_cache.stats()}
+
+
+# ---------------------------
+# Notification delivery
+# ---------------------------
+@router.get("/delivery-stats")
+async def get_delivery_stats():
+    """SMS deliveries per status and the oldest one still pending."""
+    return await delivery_stats()
+
+
+@router.post("/deliveries/requeue-dead")
+async def requeue_dead_deliveries():
+    """Retry every dead-lettered delivery from scratch (e.g. after fixing the gateway config)."""
+    return {"requeued": await requeue_dead()}
+
+
+# ---------------------------
+# Notification retention
+# ---------------------------
+@router.get("/retention-stats")
+async def get_retention_stats():
+    """Hot and archived notification counts, and what the next sweep would move or purge."""
+    return await retention_stats()
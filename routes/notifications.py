@@ -1,34 +1,240 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
+import json
+from datetime import datetime
+from auth import Principal, get_current_user, is_staff, principal_from_token, require_staff
+from broker import broker, ALL
 from database import get_db
-from models import NotificationDB
-from schemas import NotificationResponse  # ✅ use your schema for clean responses
+from models import NotificationArchiveDB, NotificationDB
+from pagination import decode_cursor, paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from sync import fetch_changes
+from schemas import (  # ✅ use your schema for clean responses
+    NotificationResponse, NotificationPage, NotificationChanges, UnreadCountResponse, NotificationMarkRead
+)
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+KEEPALIVE_SECONDS = 15
+
+
+async def inbox_owner(user_id: int, principal: Principal = Depends(get_current_user)) -> Principal:
+    """Only the user themselves or staff may read or mark a user's notifications."""
+    if principal.id != user_id and not is_staff(principal):
+        raise HTTPException(status_code=403, detail="Not your notifications")
+    return principal
+
+
+def stream_topic(principal):
+    # staff see every notification
+    return ALL if is_staff(principal) else principal.id
+
+
+# Statements shared with check_query_plans.py
+def inbox_stmt(user_id: int, is_read: Optional[bool] = None):
+    stmt = select(NotificationDB).where(NotificationDB.user_id == user_id)
+    if is_read is not None:
+        stmt = stmt.where(NotificationDB.is_read == is_read)
+    return stmt
+
+
+def archived_since_stmt(user_id: int, since: datetime):
+    """Ids retention moved out of a user's inbox after `since` (tombstones for delta sync)."""
+    return select(NotificationArchiveDB.id).where(
+        NotificationArchiveDB.user_id == user_id,
+        NotificationArchiveDB.archived_at >= since,
+    )
+
+
+def unread_count_stmt(user_id: int):
+    return select(func.count(NotificationDB.id)).where(
+        NotificationDB.user_id == user_id,
+        NotificationDB.is_read == False
+    )
+
 # ---------------------------
 # Get all notifications
 # ---------------------------
-@router.get("/", response_model=List[NotificationResponse])
-def get_notifications(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[NotificationResponse], dependencies=[Depends(require_staff)])
+async def get_notifications(db: AsyncSession = Depends(get_db)):
     """Get all notifications (for secretary dashboard)."""
-    notifs = db.query(NotificationDB).order_by(desc(NotificationDB.created_at)).all()
+    notifs = (await db.scalars(select(NotificationDB).order_by(desc(NotificationDB.created_at)))).all()
     return notifs
 
 
+# ---------------------------
+# Per-user inbox
+# ---------------------------
+@router.get("/users/{user_id}", response_model=NotificationPage, dependencies=[Depends(inbox_owner)])
+async def get_user_notifications(
+    user_id: int,
+    is_read: Optional[bool] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """One page of a user's notifications, newest first."""
+    stmt = inbox_stmt(user_id, is_read)
+    notifs, next_cursor = await paginate(db, stmt, NotificationDB.created_at, NotificationDB.id, cursor, limit)
+    return NotificationPage(items=notifs, next_cursor=next_cursor)
+
+
+# ---------------------------
+# Archived notifications
+# ---------------------------
+@router.get("/users/{user_id}/archive", response_model=NotificationPage, dependencies=[Depends(inbox_owner)])
+async def get_archived_notifications(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """One page of a user's notifications moved out by the retention sweep, newest first."""
+    stmt = select(NotificationArchiveDB).where(NotificationArchiveDB.user_id == user_id)
+    notifs, next_cursor = await paginate(
+        db, stmt, NotificationArchiveDB.created_at, NotificationArchiveDB.id, cursor, limit
+    )
+    return NotificationPage(items=notifs, next_cursor=next_cursor)
+
+
+# ---------------------------
+# Delta sync
+# ---------------------------
+@router.get("/users/{user_id}/changes", response_model=NotificationChanges, dependencies=[Depends(inbox_owner)])
+async def get_notification_changes(
+    user_id: int,
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A user's notifications created or changed (e.g. marked read) since `since`,
+    and in `removed` the ids archived by retention since then (drop them
+    locally). A full sync has no `removed`: it replaces the local set. Archived
+    ids are forgotten after NOTIFICATION_ARCHIVE_DAYS, so a client whose token
+    is older than that should do a full sync.
+    """
+    stmt = select(NotificationDB).where(NotificationDB.user_id == user_id)
+    removed = []
+    if since:
+        since_at, _ = decode_cursor(since, NotificationDB.updated_at)
+        if since_at is not None:
+            removed = (await db.scalars(archived_since_stmt(user_id, since_at))).all()
+    notifs, next_token, has_more = await fetch_changes(
+        db, stmt, NotificationDB.updated_at, NotificationDB.id, since, limit
+    )
+    return NotificationChanges(items=notifs, removed=removed, next_token=next_token, has_more=has_more)
+
+
+# ---------------------------
+# Unread counter
+# ---------------------------
+@router.get("/users/{user_id}/unread-count", response_model=UnreadCountResponse, dependencies=[Depends(inbox_owner)])
+async def get_unread_count(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Count unread notifications (index-only scan on user_id + is_read)."""
+    count = await db.scalar(unread_count_stmt(user_id))
+    return UnreadCountResponse(user_id=user_id, unread_count=count or 0)
+
+
+# ---------------------------
+# Mark many notifications as read
+# ---------------------------
+@router.put("/users/{user_id}/read", dependencies=[Depends(inbox_owner)])
+async def mark_notifications_as_read(
+    user_id: int,
+    payload: NotificationMarkRead = Body(default_factory=NotificationMarkRead),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark all (or the given) unread notifications of a user as read in one UPDATE."""
+    stmt = update(NotificationDB).where(
+        NotificationDB.user_id == user_id,
+        NotificationDB.is_read == False
+    )
+    if payload.ids is not None:
+        if not payload.ids:
+            return {"message": "0 notifications marked as read", "updated": 0}
+        stmt = stmt.where(NotificationDB.id.in_(payload.ids))
+
+    result = await db.execute(
+        stmt.values(is_read=True, updated_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    updated = result.rowcount
+    await db.commit()
+
+    return {"message": f"{updated} notifications marked as read", "updated": updated}
+
+
 # ---------------------------
 # Mark a notification as read
 # ---------------------------
 @router.put("/{notif_id}/read")
-def mark_notification_as_read(notif_id: int, db: Session = Depends(get_db)):
-    notif = db.query(NotificationDB).filter(NotificationDB.id == notif_id).first()
-    if not notif:
+async def mark_notification_as_read(
+    notif_id: int,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_user),
+):
+    notif = await db.get(NotificationDB, notif_id)
+    # Someone else's notification looks like a missing one
+    if not notif or (notif.user_id != principal.id and not is_staff(principal)):
         raise HTTPException(status_code=404, detail="Notification not found")
 
     notif.is_read = True
-    db.commit()
-    db.refresh(notif)
+    notif.updated_at = datetime.utcnow()
+    await db.commit()
 
     return {"message": f"Notification {notif.id} marked as read"}
+
+
+# ---------------------------
+# Live stream (Server-Sent Events)
+# ---------------------------
+@router.get("/stream")
+async def stream_notifications(request: Request, token: str = Query(..., description="Session token from /auth/login")):
+    """Push new notifications as they commit; EventSource cannot send headers, so the token is a query param."""
+    principal = await principal_from_token(token)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    async def events():
+        async with broker.subscribe(stream_topic(principal)) as queue:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {message['id']}\nevent: notification\ndata: {json.dumps(message)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------------------------
+# Live stream (WebSocket)
+# ---------------------------
+@router.websocket("/ws")
+async def notifications_websocket(websocket: WebSocket, token: str = Query(...)):
+    principal = await principal_from_token(token)
+    if principal is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with broker.subscribe(stream_topic(principal)) as queue:
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await websocket.send_json({"type": "keepalive"})
+                    continue
+                await websocket.send_json({"type": "notification", "data": message})
+        except WebSocketDisconnect:
+            pass
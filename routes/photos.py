@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.responses import FileResponse
+from typing import Optional
+import os
+
+from photos import HASH_RE, photo_path, media_type
+
+router = APIRouter(prefix="/photos", tags=["photos"])
+
+# Blobs are content-addressed, so a given URL never changes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# ---------------------------
+# Serve a stored photo
+# ---------------------------
+@router.get("/{photo_hash}")
+def get_photo(photo_hash: str, if_none_match: Optional[str] = Header(None)):
+    if not HASH_RE.match(photo_hash):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    etag = f'"{photo_hash}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if if_none_match and etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    path = photo_path(photo_hash)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    return FileResponse(path, media_type=media_type(path), headers=headers)
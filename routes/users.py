@@ -1,12 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Float, case, cast, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from collections import Counter
 import hashlib
-from datetime import datetime
 
 from database import get_db
-from models import UserDB, NotificationDB
-from schemas import UserCreate, UserResponse, UserLogin, UserUpdate
+from auth import Principal, STAFF_ROLES, get_current_user, invalidate_principal, is_staff, require_staff
+from photos import store_photo, photo_url
+from projection import parse_fields, load_only_columns, project, selected_columns, project_rows
+from models import NAME_KEY_SEPARATOR, UserDB, name_key, normalize_name
+from pagination import paginate, paginate_rows, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from outbox import add_notification
+from response_cache import response_cache, USERS, DOCUMENT_REQUESTS, user_tag
+from conditional import make_validators, not_modified, with_validators
+from fast_json import FAST_JSON_RESPONSES, dumps
+import counters
+from statuses import UserStatus
+from schemas import UserCreate, UserResponse, UserListItem, UserPage, UserLogin, UserUpdate, UserSearchPage, ImportReport
 
 router = APIRouter(
     prefix="/users",
@@ -40,30 +52,71 @@ def normalize_contact(contact: str) -> str:
         raise ValueError("Invalid contact number format")
 
 
+# --------------------------- List projection ---------------------------
+def _column(name: str):
+    return ([name], lambda u: getattr(u, name))
+
+
+# API field -> (columns to load, value getter) for ?fields=
+USER_FIELDS = {
+    "id": _column("id"),
+    "first_name": _column("first_name"),
+    "middle_name": _column("middle_name"),
+    "last_name": _column("last_name"),
+    "dob": _column("dob"),
+    "gender": _column("gender"),
+    "civil_status": _column("civil_status"),
+    "contact": _column("contact"),
+    "purok": _column("purok"),
+    "barangay": _column("barangay"),
+    "city": _column("city"),
+    "province": _column("province"),
+    "postal_code": _column("postal_code"),
+    "photo": (["photo_hash", "photo"], lambda u: u.photo_url),
+    "role": _column("role"),
+    "status": _column("status"),
+}
+
+# Fast path (FAST_JSON_RESPONSES): getters for plain column tuples
+USER_ROW_GETTERS = {
+    **{name: getter for name, (_, getter) in USER_FIELDS.items()},
+    "dob": lambda u: u.dob.date() if u.dob else None,  # UserListItem.dob is a date
+    "photo": lambda u: photo_url(u.photo_hash) if u.photo_hash else u.photo,
+}
+
+
 # --------------------------- Routes ---------------------------
 
 # Register new user with notification
 @router.post("/", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    # Staff roles are granted by staff (PUT /users/{id}), never self-chosen
+    if user.role != "resident":
+        raise HTTPException(status_code=400, detail="Only residents can register")
+
     try:
         normalized_contact = normalize_contact(user.contact)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid contact number format")
 
     # Check existing contact
-    if db.query(UserDB).filter(UserDB.contact == normalized_contact).first():
+    if await db.scalar(select(UserDB.id).where(UserDB.contact == normalized_contact)):
         raise HTTPException(status_code=400, detail="Contact already registered")
 
-    # Check duplicate name
-    if db.query(UserDB).filter(
-        UserDB.first_name.ilike(user.firstName.strip()),
-        UserDB.last_name.ilike(user.lastName.strip())
-    ).first():
+    # Check duplicate name (indexed name_key instead of two ilike scans)
+    if await db.scalar(select(UserDB.id).where(
+        UserDB.name_key == name_key(user.firstName, user.lastName)
+    ).limit(1)):
         raise HTTPException(status_code=400, detail="User with same name already registered")
 
     if not user.photo or user.photo.strip() == "":
         raise HTTPException(status_code=400, detail="Photo is required for registration")
 
+    try:
+        photo_hash = await run_in_threadpool(store_photo, user.photo)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid photo data")
+
     # Create user
     db_user = UserDB(
         first_name=user.firstName.strip(),
@@ -79,25 +132,24 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         province=user.province,
         postal_code=user.postalCode,
         password=hash_password(user.password),
-        photo=user.photo,
+        photo_hash=photo_hash,
         role=user.role,
         status="Pending",
     )
 
     db.add(db_user)
-    db.flush()  # get ID before commit
-
-    # Create notification
-    notif = NotificationDB(
-        title="New User Registration",
-        message=f"{db_user.first_name} {db_user.last_name} registered as {db_user.role}.",
+    await db.flush()  # get ID before commit
+
+    # Create notification (same transaction)
+    add_notification(
+        db,
+        db_user.id,
+        "New User Registration",
+        f"{db_user.first_name} {db_user.last_name} registered as {db_user.role}.",
         type="registration",
-        user_id=db_user.id,
-        created_at=datetime.utcnow()
     )
-    db.add(notif)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await response_cache.invalidate(USERS)
 
     return UserResponse(
         id=db_user.id,
@@ -113,32 +165,68 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         city=db_user.city,
         province=db_user.province,
         postalCode=db_user.postal_code,
-        photo=db_user.photo,
+        photo=db_user.photo_url,
         role=db_user.role,
         status=db_user.status,
     )
 
 
-# Login route
-@router.post("/login", response_model=UserResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+# --------------------------- Bulk import ---------------------------
+IMPORT_CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+
+@router.post("/import", response_model=ImportReport, dependencies=[Depends(require_staff)])
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from Content-Type)"),
+    status: str = Query("Pending", description="Status of the imported accounts: Pending or Approved"),
+    dry_run: bool = Query(False, description="Validate and check duplicates only, insert nothing"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import residents from a census CSV (header row) or NDJSON request body,
+    streamed in chunks. Returns a per-row error report; valid rows are imported.
+    Staff only; every row must be a resident.
+    """
+    from resident_import import import_residents  # imports this module
+
+    format = format or IMPORT_CONTENT_TYPES.get(request.headers.get("content-type", "").split(";")[0].strip())
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=")
+    member = UserStatus.from_label(status)
+    if member not in (UserStatus.PENDING, UserStatus.APPROVED):
+        raise HTTPException(status_code=400, detail=f"Invalid import status: {status}")
+
+    return await import_residents(db, request.stream(), format, member.label, dry_run)
+
+
+# --------------------------- Authentication ---------------------------
+async def authenticate(db: AsyncSession, credentials: UserLogin) -> UserDB:
+    """Check contact + password (and account approval), raise HTTP errors otherwise."""
     try:
-        normalized_contact = normalize_contact(user.contact)
+        normalized_contact = normalize_contact(credentials.contact)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid contact number format")
 
-    db_user = db.query(UserDB).filter(UserDB.contact == normalized_contact).first()
+    db_user = await db.scalar(select(UserDB).where(UserDB.contact == normalized_contact))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(user.password, db_user.password):
+    if not verify_password(credentials.password, db_user.password):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
-    if db_user.role == "resident" and db_user.status != "Approved":
+    if db_user.status != UserStatus.APPROVED.label:
         raise HTTPException(
             status_code=403,
-            detail=f"Resident account not approved. Current status: {db_user.status}"
+            detail=f"Account not approved. Current status: {db_user.status}"
         )
+    return db_user
+
+
+# Login route
+@router.post("/login", response_model=UserResponse)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await authenticate(db, user)
 
     return UserResponse(
         id=db_user.id,
@@ -154,35 +242,195 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
         city=db_user.city,
         province=db_user.province,
         postalCode=db_user.postal_code,
-        photo=db_user.photo,
+        photo=db_user.photo_url,
         role=db_user.role,
         status=db_user.status,
     )
 
 
-# Get all users
-@router.get("/", response_model=List[UserResponse])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(UserDB).all()
+# --------------------------- User directory ---------------------------
+def user_filters(status: Optional[str] = None, role: Optional[str] = None,
+                 barangay: Optional[str] = None, purok: Optional[str] = None) -> list:
+    """WHERE clauses for the GET /users/ query params."""
+    filters = []
+    if status:
+        member = UserStatus.from_label(status)
+        if member is None:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        filters.append(UserDB.status == member)
+    if role:
+        filters.append(UserDB.role == role)
+    if barangay:
+        filters.append(UserDB.barangay == barangay)
+    if purok:
+        filters.append(UserDB.purok == purok)
+    return filters
+
+
+async def list_users(
+    request: Request, db: AsyncSession, fields: Optional[str], limit: int, cursor: Optional[str],
+    status: Optional[str] = None, role: Optional[str] = None,
+    barangay: Optional[str] = None, purok: Optional[str] = None,
+):
+    """One page of users, newest registration first (keyset on id)."""
+    selected = parse_fields(fields, USER_FIELDS)
+    filters = user_filters(status, role, barangay, purok)
+    # Effective filters, not the raw query string: /users/pending and /users/?status=Pending&role=resident share entries
+    params = [(k, str(v)) for k, v in (
+        ("status", status), ("role", role), ("barangay", barangay), ("purok", purok),
+        ("fields", fields), ("limit", limit), ("cursor", cursor),
+    ) if v is not None]
+
+    # --- Conditional GET: answer 304 before loading or serializing any row ---
+    count, changed = (await db.execute(
+        select(func.count(UserDB.id), func.max(UserDB.updated_at)).where(*filters)
+    )).one()
+    validators = make_validators("GET /users/", params, count, changed)  # no Last-Modified, see conditional.py
+    unchanged = not_modified(request, validators)
+    if unchanged is not None:
+        return unchanged
+
+    # Keyed by the ETag too: a body cached by a worker that missed another's invalidation is never sent
+    # under newer validators
+    cache_key = await response_cache.key(USERS, "GET /users/", [*params, ("etag", validators.etag)])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return with_validators(cached, validators)
+
+    # The id is both the sort key and the tie-breaker
+    if FAST_JSON_RESPONSES:
+        stmt = select(*selected_columns(UserDB, USER_FIELDS, selected)).where(*filters)
+        rows, next_cursor = await paginate_rows(db, stmt, UserDB.id, UserDB.id, cursor, limit)
+        body = dumps({"items": project_rows(rows, USER_ROW_GETTERS, selected), "next_cursor": next_cursor})
+        return with_validators(await response_cache.store_body(cache_key, body), validators)
+
+    stmt = select(UserDB).options(load_only_columns(UserDB, USER_FIELDS, selected)).where(*filters)
+    users, next_cursor = await paginate(db, stmt, UserDB.id, UserDB.id, cursor, limit)
+    page = UserPage(items=[UserListItem(**project(u, USER_FIELDS, selected)) for u in users], next_cursor=next_cursor)
+    return with_validators(await response_cache.store(cache_key, page, UserPage, exclude_unset=True), validators)
+
+
+# Get all users (paginated, filterable)
+@router.get("/", response_model=UserPage, response_model_exclude_unset=True)
+async def get_users(
+    request: Request,
+    status: Optional[str] = Query(None, description="Pending, Approved or Rejected"),
+    role: Optional[str] = Query(None),
+    barangay: Optional[str] = Query(None),
+    purok: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,first_name,last_name"),
+    db: AsyncSession = Depends(get_db)
+):
+    return await list_users(request, db, fields, limit, cursor, status, role, barangay, purok)
+
+
+# Pending approvals
+@router.get("/pending", response_model=UserPage, response_model_exclude_unset=True)
+async def get_pending_users(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,first_name,last_name"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Residents waiting for approval (partial index on pending users, so cost follows the queue, not the census)."""
+    return await list_users(request, db, fields, limit, cursor, status=UserStatus.PENDING.label, role="resident")
+
+
+# --------------------------- Name search ---------------------------
+SEARCH_COLUMNS = (
+    UserDB.id, UserDB.first_name, UserDB.middle_name, UserDB.last_name,
+    UserDB.contact, UserDB.purok, UserDB.barangay, UserDB.role, UserDB.status,
+)
+
+
+def search_stmt(q: str, dialect: str):
+    """
+    Users whose name matches `q`, with a `rank` column (higher = better).
+    Postgres: pg_trgm similarity plus a boost for first/last-name prefixes, served
+    by the trigram GIN index. SQLite (tests): substring match, prefixes first.
+    """
+    key = normalize_name(q)
+    contains = UserDB.name_key.contains(key, autoescape=True)
+    prefix = or_(
+        UserDB.name_key.startswith(key, autoescape=True),
+        UserDB.name_key.contains(f" {key}", autoescape=True),
+        UserDB.name_key.contains(f"{NAME_KEY_SEPARATOR}{key}", autoescape=True),  # last name
+    )
+    if dialect == "postgresql":
+        rank = func.similarity(UserDB.name_key, key) + case((prefix, 1.0), else_=0.0)
+        match = or_(contains, UserDB.name_key.op("%")(key))
+    else:
+        rank = case((prefix, 1.0), else_=0.0)
+        match = contains
+    return select(*SEARCH_COLUMNS, cast(rank, Float).label("rank")).where(match)
+
+
+@router.get("/search", response_model=UserSearchPage)
+async def search_users(
+    q: str = Query(..., min_length=2, description="Part of a first or last name"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ranked, paginated name search without photos (for the secretary's lookup)."""
+    stmt = search_stmt(q, db.bind.dialect.name)
+    rank = stmt.selected_columns.rank
+    rows, next_cursor = await paginate_rows(db, stmt, rank, UserDB.id, cursor, limit)
+    return UserSearchPage(items=rows, next_cursor=next_cursor)
 
 
 # Get user by ID
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
+async def get_user(user_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # --- Conditional GET from the row's updated_at alone ---
+    changed = await db.scalar(select(UserDB.updated_at).where(UserDB.id == user_id))
+    if changed is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    validators = make_validators("GET /users/{user_id}", (), user_id, changed, last_modified=changed)
+    unchanged = not_modified(request, validators)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = await response_cache.key(user_tag(user_id), "GET /users/{user_id}", [("etag", validators.etag)])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return with_validators(cached, validators)
+
+    db_user = await db.get(UserDB, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user
+    return with_validators(await response_cache.store(cache_key, db_user, UserResponse), validators)
 
 
 # Update user info
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, update_data: UserUpdate, db: Session = Depends(get_db)):
-    db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
+async def update_user(
+    user_id: int,
+    update_data: UserUpdate,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_user),
+):
+    data = update_data.dict(exclude_unset=True)
+
+    # Residents edit their own name; approvals and roles are staff decisions
+    if not is_staff(principal) and (principal.id != user_id or "status" in data or "role" in data):
+        raise HTTPException(status_code=403, detail="Staff only")
+    if data.get("role") is not None and data["role"] not in ("resident", *STAFF_ROLES):
+        raise HTTPException(status_code=400, detail=f"Invalid role: {data['role']}")
+
+    db_user = await db.get(UserDB, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    data = update_data.dict(exclude_unset=True)
+    # Only known account statuses can be stored (smallint-coded column)
+    if data.get("status") is not None:
+        member = UserStatus.from_label(data["status"])
+        if member is None:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {data['status']}")
+        data["status"] = member.label
 
     # Normalize contact if being updated
     if "contact" in data:
@@ -194,18 +442,26 @@ def update_user(user_id: int, update_data: UserUpdate, db: Session = Depends(get
     for key, value in data.items():
         setattr(db_user, key, value)
 
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    invalidate_principal(user_id)
+    # Request lists embed the user's name and photo
+    await response_cache.invalidate(USERS, user_tag(user_id), DOCUMENT_REQUESTS)
     return db_user
 
 
 # Delete user
 @router.delete("/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(UserDB, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)  # loads cascaded requests/notifications
+    deltas = Counter()
+    for db_request in db_user.document_requests:
+        counters.move(deltas, counters.counter_key(db_request), None)
+    await counters.apply(db, deltas)
+    await db.commit()
+    invalidate_principal(user_id)
+    await response_cache.invalidate(USERS, user_tag(user_id), DOCUMENT_REQUESTS)
     return {"message": "User deleted successfully"}
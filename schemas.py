@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from datetime import datetime, date
-from typing import Optional
+from typing import Optional, List, Dict, Literal
 
 
 # ---------------- User Schema (for create) ----------------
@@ -30,6 +30,27 @@ class UserLogin(BaseModel):
     password: str
 
 
+# ---------------- Authenticated Principal ----------------
+class PrincipalResponse(BaseModel):
+    id: int
+    firstName: str = Field(..., alias="first_name")
+    middleName: Optional[str] = Field(None, alias="middle_name")
+    lastName: str = Field(..., alias="last_name")
+    contact: str
+    role: str
+    status: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+# ---------------- Session Token ----------------
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user: PrincipalResponse
+
+
 # ---------------- User Update ----------------
 class UserUpdate(BaseModel):
     first_name: Optional[str] = None
@@ -46,7 +67,7 @@ class UserInfoResponse(BaseModel):
     firstName: str = Field(..., alias="first_name")
     middleName: Optional[str] = Field(None, alias="middle_name")
     lastName: str = Field(..., alias="last_name")
-    photo: Optional[str] = None
+    photo: Optional[str] = Field(None, validation_alias=AliasChoices("photo_url", "photo"))
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
@@ -66,13 +87,96 @@ class UserResponse(BaseModel):
     city: str
     province: str
     postalCode: str = Field(..., alias="postal_code")
-    photo: str
+    photo: Optional[str] = Field(None, validation_alias=AliasChoices("photo_url", "photo"))  # /photos/{hash} URL
     role: str
     status: str
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+# ---------------- User List Item (?fields= projection) ----------------
+class UserListItem(BaseModel):
+    id: int
+    firstName: Optional[str] = Field(None, alias="first_name")
+    middleName: Optional[str] = Field(None, alias="middle_name")
+    lastName: Optional[str] = Field(None, alias="last_name")
+    dob: Optional[date] = None
+    gender: Optional[str] = None
+    civilStatus: Optional[str] = Field(None, alias="civil_status")
+    contact: Optional[str] = None
+    purok: Optional[str] = None
+    barangay: Optional[str] = None
+    city: Optional[str] = None
+    province: Optional[str] = None
+    postalCode: Optional[str] = Field(None, alias="postal_code")
+    photo: Optional[str] = None
+    role: Optional[str] = None
+    status: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+# ---------------- User Page ----------------
+class UserPage(BaseModel):
+    items: List[UserListItem]
+    next_cursor: Optional[str] = None
+
+
+# ---------------- User Search (photo-free) ----------------
+class UserSearchItem(BaseModel):
+    id: int
+    firstName: str = Field(..., alias="first_name")
+    middleName: Optional[str] = Field(None, alias="middle_name")
+    lastName: str = Field(..., alias="last_name")
+    contact: str
+    purok: str
+    barangay: str
+    role: str
+    status: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class UserSearchPage(BaseModel):
+    items: List[UserSearchItem]
+    next_cursor: Optional[str] = None
+
+
+# ---------------- Bulk Resident Import ----------------
+class ResidentImportRow(BaseModel):
+    """One census row; accepts the snake_case column names of a census export or UserCreate's camelCase."""
+    firstName: str = Field(..., validation_alias=AliasChoices("first_name", "firstName"))
+    middleName: Optional[str] = Field(None, validation_alias=AliasChoices("middle_name", "middleName"))
+    lastName: str = Field(..., validation_alias=AliasChoices("last_name", "lastName"))
+    dob: date
+    gender: str
+    civilStatus: str = Field(..., validation_alias=AliasChoices("civil_status", "civilStatus"))
+    contact: str
+    purok: str
+    barangay: str
+    city: str
+    province: str
+    postalCode: str = Field(..., validation_alias=AliasChoices("postal_code", "postalCode"))
+    password: Optional[str] = None  # missing: stored unusable (UNUSABLE_PASSWORD), the account cannot log in
+    role: Literal["resident"] = "resident"  # staff roles are never granted by an import
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+
+class ImportRowError(BaseModel):
+    line: int
+    contact: Optional[str] = None
+    errors: List[str]
+
+
+class ImportReport(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    dry_run: bool
+    errors: List[ImportRowError]
+
+
 # ---------------- Document Request Schema ----------------
 class DocumentRequest(BaseModel):
     documentType: str
@@ -121,6 +225,57 @@ class DocumentRequestResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# ---------------- Document Request List Item (?fields= projection) ----------------
+class DocumentRequestListItem(BaseModel):
+    id: int
+    documentType: Optional[str] = None
+    purpose: Optional[str] = None
+    copies: Optional[int] = None
+    requirements: Optional[str] = None
+    photo: Optional[str] = None
+    contact: Optional[str] = None
+    notes: Optional[str] = None
+    status: Optional[str] = None
+    action: Optional[str] = None
+    user_id: Optional[int] = None
+    pickup_date: Optional[datetime] = None
+
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    user: Optional[UserInfoResponse] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ---------------- Document Request Page ----------------
+class DocumentRequestPage(BaseModel):
+    items: List[DocumentRequestListItem]
+    next_cursor: Optional[str] = None
+
+
+# ---------------- Document Request Changes (delta sync) ----------------
+class DocumentRequestChanges(BaseModel):
+    items: List[DocumentRequestListItem]  # created or updated since the token
+    deleted: List[int]  # tombstones: ids soft deleted since the token
+    next_token: str
+    has_more: bool
+
+
+# ---------------- Dashboard Stats ----------------
+class RequestStatsBucket(BaseModel):
+    status: str
+    documentType: str
+    count: int
+
+
+class RequestStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_document_type: Dict[str, int]
+    buckets: List[RequestStatsBucket]
+
+
 # ---------------- Status Update ----------------
 class StatusUpdate(BaseModel):
     id: int
@@ -129,6 +284,23 @@ class StatusUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+# ---------------- Bulk Status Update ----------------
+class BulkStatusUpdate(BaseModel):
+    items: List[StatusUpdate] = Field(..., min_length=1, max_length=500)
+
+
+class BulkStatusResult(BaseModel):
+    id: int
+    success: bool
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class BulkStatusResponse(BaseModel):
+    updated: int
+    results: List[BulkStatusResult]
+
+
 # ---------------- Notification Schema ----------------
 class NotificationResponse(BaseModel):
     id: int
@@ -140,3 +312,28 @@ class NotificationResponse(BaseModel):
     user_id: Optional[int]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# ---------------- Notification Page ----------------
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+
+
+# ---------------- Notification Changes (delta sync) ----------------
+class NotificationChanges(BaseModel):
+    items: List[NotificationResponse]
+    removed: List[int] = []  # archived since the token (see GET /notifications/users/{id}/changes)
+    next_token: str
+    has_more: bool
+
+
+# ---------------- Notification Unread Count ----------------
+class UnreadCountResponse(BaseModel):
+    user_id: int
+    unread_count: int
+
+
+# ---------------- Mark Notifications Read ----------------
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[int]] = None  # None = mark every unread notification
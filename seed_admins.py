@@ -1,23 +1,35 @@
 from database import SessionLocal
 from models import UserDB
+from sqlalchemy import select
 import hashlib
+from datetime import datetime
 
 # --- Helper function for hashing ---
 def hash_password(password: str):
     return hashlib.sha256(password.encode()).hexdigest()
 
 # --- Seed admins (secretary & captain) ---
+ADMIN_ROLES = ("secretary", "captain")
+
+
+def missing_admin_roles(db) -> list:
+    """Admin roles with no account yet (one query)."""
+    existing = set(db.scalars(select(UserDB.role).where(UserDB.role.in_(ADMIN_ROLES)).distinct()))
+    return [role for role in ADMIN_ROLES if role not in existing]
+
+
 def seed_admins():
     db = SessionLocal()
     try:
+        missing = missing_admin_roles(db)
+
         # Secretary account
-        secretary = db.query(UserDB).filter(UserDB.role == "secretary").first()
-        if not secretary:
+        if "secretary" in missing:
             db.add(UserDB(
                 first_name="System",
                 middle_name=None,
                 last_name="Secretary",
-                dob="1970-01-01",            # default dob
+                dob=datetime(1970, 1, 1),      # default dob
                 gender="N/A",
                 civil_status="N/A",
                 contact="+639123456789",
@@ -29,18 +41,17 @@ def seed_admins():
                 password=hash_password("secret123"),
                 photo="default_photo.png",     # default photo
                 role="secretary",
-                status="Pending",
+                status="Approved",
             ))
             print("✅ Secretary account created.")
 
         # Captain account
-        captain = db.query(UserDB).filter(UserDB.role == "captain").first()
-        if not captain:
+        if "captain" in missing:
             db.add(UserDB(
                 first_name="System",
                 middle_name=None,
                 last_name="Captain",
-                dob="1970-01-01",            # default dob
+                dob=datetime(1970, 1, 1),      # default dob
                 gender="N/A",
                 civil_status="N/A",
                 contact="+639987654321",
@@ -52,11 +63,12 @@ def seed_admins():
                 password=hash_password("captain123"),
                 photo="default_photo.png",     # default photo
                 role="captain",
-                status="Pending",
+                status="Approved",
             ))
             print("✅ Captain account created.")
 
-        db.commit()
+        if missing:
+            db.commit()
     finally:
         db.close()
 
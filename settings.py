@@ -0,0 +1,58 @@
+# settings.py
+import os
+from dataclasses import dataclass, replace
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# ---------------- Database profile ----------------
+@dataclass(frozen=True)
+class DatabaseSettings:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float       # seconds to wait for a free connection
+    pool_recycle: int         # seconds before a connection is replaced
+    pool_pre_ping: bool
+    statement_timeout_ms: int  # 0 = no server-side limit
+    echo: bool
+
+
+# Base values per DB_PROFILE; every field can be overridden with DB_<FIELD>
+PROFILES = {
+    "development": DatabaseSettings(
+        pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800,
+        pool_pre_ping=True, statement_timeout_ms=0, echo=True,
+    ),
+    "production": DatabaseSettings(
+        pool_size=10, max_overflow=5, pool_timeout=10, pool_recycle=1800,
+        pool_pre_ping=True, statement_timeout_ms=15000, echo=False,
+    ),
+}
+
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_database_settings() -> DatabaseSettings:
+    """Pick the DB_PROFILE base settings and apply DB_* env overrides."""
+    profile = os.getenv("DB_PROFILE", "production")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE: {profile}")
+    settings = PROFILES[profile]
+
+    overrides = {}
+    for field, cast in (
+        ("pool_size", int),
+        ("max_overflow", int),
+        ("pool_timeout", float),
+        ("pool_recycle", int),
+        ("pool_pre_ping", _env_bool),
+        ("statement_timeout_ms", int),
+        ("echo", _env_bool),
+    ):
+        value = os.getenv(f"DB_{field.upper()}")
+        if value is not None:
+            overrides[field] = cast(value)
+    return replace(settings, **overrides)
@@ -0,0 +1,88 @@
+# state_machine.py
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from models import RequestStatusTransitionDB
+from statuses import RequestStatus
+
+# Rows seeded by migration 0004 (the rules formerly hard-coded in update_request_status)
+DEFAULT_TRANSITIONS = [
+    # from_status, to_status, default_action, default_notes, accepts_notes, sets_pickup_date
+    (None, "Returned", "Update Request", "Request returned for correction", True, False),
+    (None, "Rejected", "Reject", "Request rejected", True, False),
+    (None, "Approved", "Review", "", False, False),
+    (None, "For Print", "Review", "", False, False),
+    (None, "Completed", "Review", "", False, False),
+    (None, "For Pickup", "Pickup", "", False, True),
+    ("Returned", "Pending", "Resubmitted", "", False, False),
+]
+
+
+@dataclass(frozen=True)
+class Transition:
+    from_status: Optional[str]
+    to_status: str
+    default_action: str
+    default_notes: str
+    accepts_notes: bool
+    sets_pickup_date: bool
+
+
+class StatusMachine:
+    """In-memory view of request_status_transitions."""
+
+    def __init__(self, transitions: List[Transition]):
+        self._by_target: Dict[str, List[Transition]] = defaultdict(list)
+        for transition in transitions:
+            self._by_target[transition.to_status].append(transition)
+
+    def resolve(self, old_status: Optional[str], new_status: str, action: Optional[str],
+                notes: Optional[str], now: datetime) -> dict:
+        """Column values for old_status -> new_status; 400 if the move is not allowed."""
+        target = RequestStatus.from_label(new_status)
+        candidates = self._by_target.get(target.label) if target else None
+        if not candidates:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {new_status}")
+
+        transition = next(
+            (t for t in candidates if t.from_status in (None, old_status)), None
+        )
+        if transition is None:
+            allowed = ", ".join(sorted(t.from_status for t in candidates))
+            raise HTTPException(status_code=400, detail=f"Only {allowed} requests can be moved to {target.label}.")
+
+        values = {
+            "status": transition.to_status,
+            "action": action or transition.default_action,
+            "notes": (notes or transition.default_notes) if transition.accepts_notes else transition.default_notes,
+        }
+        if transition.sets_pickup_date:
+            values["pickup_date"] = now
+        return values
+
+
+_machine: Optional[StatusMachine] = None
+
+
+async def get_status_machine(db) -> StatusMachine:
+    """Load the transition table on first use and keep it in memory."""
+    global _machine
+    if _machine is None:
+        rows = (await db.scalars(select(RequestStatusTransitionDB))).all()
+        _machine = StatusMachine([
+            Transition(r.from_status, r.to_status, r.default_action, r.default_notes or "",
+                       bool(r.accepts_notes), bool(r.sets_pickup_date))
+            for r in rows
+        ])
+    return _machine
+
+
+def reload_status_machine():
+    """Forget the cached table (after editing request_status_transitions)."""
+    global _machine
+    _machine = None
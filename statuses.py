@@ -0,0 +1,83 @@
+# statuses.py
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedEnum(Enum):
+    """Members are (code, label): stored as a smallint code, exposed to the API as the label."""
+
+    def __init__(self, code: int, label: str):
+        self.code = code
+        self.label = label
+
+    @classmethod
+    def from_label(cls, label: Optional[str]) -> Optional["CodedEnum"]:
+        """Case-insensitive label lookup; None if unknown."""
+        wanted = (label or "").strip().lower()
+        for member in cls:
+            if member.label.lower() == wanted:
+                return member
+        return None
+
+    @classmethod
+    def from_code(cls, code: int) -> "CodedEnum":
+        for member in cls:
+            if member.code == code:
+                return member
+        raise ValueError(f"Unknown {cls.__name__} code: {code}")
+
+
+# ---------------- Document request status ----------------
+class RequestStatus(CodedEnum):
+    PENDING = (1, "Pending")
+    APPROVED = (2, "Approved")
+    FOR_PRINT = (3, "For Print")
+    FOR_PICKUP = (4, "For Pickup")
+    COMPLETED = (5, "Completed")
+    RETURNED = (6, "Returned")
+    REJECTED = (7, "Rejected")
+    CANCELLED = (8, "Cancelled")
+
+
+# ---------------- User account status ----------------
+class UserStatus(CodedEnum):
+    PENDING = (1, "Pending")
+    APPROVED = (2, "Approved")
+    REJECTED = (3, "Rejected")
+
+
+# ---------------- SMS/push delivery status ----------------
+class DeliveryStatus(CodedEnum):
+    PENDING = (1, "Pending")  # waiting for its next attempt
+    SENT = (2, "Sent")
+    DEAD = (3, "Dead")  # gave up (dead letter); requeue with POST /internal/deliveries/requeue-dead
+
+
+# ---------------- Column type ----------------
+class StatusCode(TypeDecorator):
+    """SMALLINT column that reads and writes the status label ("Approved" <-> 2)."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls):
+        super().__init__()
+        self.enum_cls = enum_cls
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, CodedEnum):
+            return value.code
+        member = self.enum_cls.from_label(value)
+        if member is None:
+            raise ValueError(f"Unknown {self.enum_cls.__name__}: {value}")
+        return member.code
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.enum_cls.from_code(int(value)).label
@@ -0,0 +1,60 @@
+# sync.py
+"""
+Delta sync for offline clients: rows whose updated_at moved past a sync token,
+oldest change first, plus the token to send next time.
+
+updated_at is stamped when a transaction writes, not when it commits, so a
+slow transaction can commit a change older than a token already handed out.
+The final token of a sync is therefore never newer than now minus
+SYNC_SETTLE_SECONDS: the next sync re-sends that recent window (clients
+apply changes as idempotent upserts) and late commits inside it are caught.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pagination import encode_cursor, decode_cursor
+
+load_dotenv()
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "60"))
+
+
+def changes_stmt(stmt: Select, updated_col, id_col, since: Optional[str], limit: int) -> Select:
+    """`stmt` past the token, ordered by (updated_at, id) ascending, one page (+1 row to detect more)."""
+    if since:
+        stmt = stmt.where(tuple_(updated_col, id_col) > decode_cursor(since, updated_col))
+    return stmt.order_by(updated_col.asc(), id_col.asc()).limit(limit + 1)
+
+
+def _settled(horizon: datetime, like: Optional[datetime]) -> datetime:
+    """The naive-UTC horizon in the same flavour (naive/aware) as `like` so they compare."""
+    if like is not None and like.tzinfo is not None:
+        return horizon.replace(tzinfo=timezone.utc)
+    return horizon
+
+
+async def fetch_changes(
+    db: AsyncSession, stmt: Select, updated_col, id_col, since: Optional[str], limit: int
+) -> Tuple[List[Any], str, bool]:
+    """Return (changed rows, next token, has_more); keep calling with the token while has_more."""
+    horizon = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    rows = (await db.execute(changes_stmt(stmt, updated_col, id_col, since, limit))).scalars().all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(getattr(last, updated_col.key), getattr(last, id_col.key)), True
+
+    if rows:
+        high = (getattr(rows[-1], updated_col.key), getattr(rows[-1], id_col.key))
+    elif since:
+        high = decode_cursor(since, updated_col)
+    else:
+        high = (None, 0)
+    settled = (_settled(horizon, high[0]), 0)
+    token = high if high[0] is not None and high <= settled else settled
+    return rows, encode_cursor(*token), False
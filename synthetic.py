@@ -0,0 +1,191 @@
+# synthetic.py
+"""
+Synthetic barangay dataset for benchmarks, load tests and query plan checks.
+
+    python synthetic.py --users 10000                       # ~40k requests, ~200k notifications
+    python synthetic.py --users 500000 --notifications-per-user 20   # 2M requests, 10M notifications
+
+Rows are generated in batches of residents (with their requests and
+notifications) so memory stays flat at any scale, from a seeded RNG so the
+same arguments give the same dataset. Photos are realistic JPEG-sized blobs
+(log-normal, ~80 KB median) written to the photo store once and shared by
+many rows through photo_hash, like real duplicate uploads; the store holds
+--photo-pool blobs instead of one per user.
+
+Every resident's password is SYNTHETIC_PASSWORD, so load_test.py can log in
+as any of them. request_counters are rebuilt and statistics refreshed (ANALYZE) at the end.
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from counters import rebuild_stmts
+from database import engine
+from models import UserDB, DocumentRequestDB, NotificationDB, name_key
+from photos import store_photo_bytes
+from routes.users import hash_password
+import migrations
+
+SYNTHETIC_PASSWORD = "synthetic"
+BARANGAY = "San Isidro"
+PUROKS = [f"Purok {n}" for n in range(1, 8)]
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Mark", "Kristine", "John Paul", "Mary Joy",
+    "Ramon", "Liza", "Carlo", "Angelica", "Miguel", "Jasmine", "Rodel", "Maricel", "Jerome", "Cristina",
+    "Renato", "Josefina", "Noel", "Lorna", "Arnel", "Rowena", "Dennis", "Sheila", "Ronaldo", "Grace",
+]
+LAST_NAMES = [
+    "Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Ramos", "Aquino", "Castillo",
+    "Flores", "Gonzales", "Cruz", "Torres", "Navarro", "Domingo", "Mercado", "Salazar", "Pascual", "Valdez",
+    "Rivera", "Fernandez", "Lopez", "Morales", "Soriano", "Manalo", "Tolentino", "Aguilar", "Panganiban", "Lim",
+]
+DOCUMENT_TYPES = [  # (type, weight)
+    ("Barangay Clearance", 40), ("Certificate of Residency", 25), ("Certificate of Indigency", 20),
+    ("Business Permit", 10), ("Barangay ID", 5),
+]
+PURPOSES = ["Employment", "Scholarship", "Medical Assistance", "Bank Requirement", "School Requirement", "Travel"]
+REQUEST_STATUSES = [  # (label, weight): most requests are old and finished
+    ("Completed", 55), ("Pending", 10), ("Approved", 8), ("For Print", 4), ("For Pickup", 6),
+    ("Returned", 3), ("Rejected", 9), ("Cancelled", 5),
+]
+NOTIFICATION_TITLES = [
+    ("New Document Request Submitted", "Your request for {doc} has been submitted and is now under review."),
+    ("Request Status Updated", "Your document request for {doc} is now '{status}'."),
+    ("Account Approved", "Your account has been approved. You can now request documents."),
+]
+HISTORY_MINUTES = 3 * 365 * 24 * 60  # three years of activity
+
+
+def contact_for(n: int) -> str:
+    """Synthetic mobile number for the n-th generated resident (unique, normalized 09… form)."""
+    return f"09{n:09d}"
+
+
+# ---------------- Photos ----------------
+def photo_pool(rng: random.Random, size: int, median_kb: float = 80) -> list:
+    """Store `size` JPEG-like blobs of log-normal size and return their hashes."""
+    hashes = []
+    for _ in range(size):
+        length = int(min(max(rng.lognormvariate(math.log(median_kb * 1024), 0.6), 8 * 1024), 2 * 1024 * 1024))
+        body = b"\xff\xd8\xff\xe0" + rng.randbytes(length - 6) + b"\xff\xd9"
+        hashes.append(store_photo_bytes(body))
+    return hashes
+
+
+# ---------------- Rows ----------------
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def user_rows(rng: random.Random, first: int, count: int, photos: list, password: str) -> list:
+    rows = []
+    for n in range(first, first + count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append({
+            "first_name": first_name, "middle_name": rng.choice(LAST_NAMES) if rng.random() < 0.8 else None,
+            "last_name": last_name, "dob": datetime(1940, 1, 1) + timedelta(days=rng.randint(0, 29_000)),
+            "gender": rng.choice(["Male", "Female"]), "civil_status": rng.choice(["Single", "Married", "Widowed"]),
+            "contact": contact_for(n), "purok": rng.choice(PUROKS), "barangay": BARANGAY,
+            "city": "Santa Rosa", "province": "Laguna", "postal_code": "4026", "password": password,
+            "photo_hash": rng.choice(photos) if photos else None, "role": "resident",
+            "status": "Pending" if rng.random() < 0.02 else ("Rejected" if rng.random() < 0.005 else "Approved"),
+            "name_key": name_key(first_name, last_name),  # Core inserts skip the mapper event
+        })
+    return rows
+
+
+def activity_rows(rng: random.Random, users, now: datetime, requests_per_user: float,
+                  notifications_per_user: float, photos: list):
+    """Document requests and notifications for the (id, contact) pairs in `users`."""
+    requests, notifications = [], []
+    for user_id, contact in users:
+        for _ in range(rng.randint(0, round(2 * requests_per_user))):  # mean requests_per_user
+            created = now - timedelta(minutes=rng.randint(0, HISTORY_MINUTES))
+            updated = min(created + timedelta(minutes=rng.randint(0, 14 * 24 * 60)), now)
+            deleted = rng.random() < 0.03
+            requests.append({
+                "document_type": _weighted(rng, DOCUMENT_TYPES), "purpose": rng.choice(PURPOSES),
+                "copies": rng.choice([1, 1, 1, 2, 3]), "requirements": "", "notes": "",
+                "photo_hash": rng.choice(photos) if photos and rng.random() < 0.3 else None,
+                "status": _weighted(rng, REQUEST_STATUSES), "action": "Review", "contact": contact,
+                "user_id": user_id, "created_at": created, "updated_at": updated,
+                "is_deleted": deleted, "deleted_at": updated if deleted else None,
+            })
+        for _ in range(rng.randint(0, round(2 * notifications_per_user))):
+            created = now - timedelta(minutes=rng.randint(0, HISTORY_MINUTES))
+            title, message = rng.choice(NOTIFICATION_TITLES)
+            notifications.append({
+                "title": title, "type": "info", "user_id": user_id,
+                "message": message.format(doc=_weighted(rng, DOCUMENT_TYPES), status=_weighted(rng, REQUEST_STATUSES)),
+                "is_read": created < now - timedelta(days=7) or rng.random() < 0.5,
+                "created_at": created, "updated_at": created,
+            })
+    return requests, notifications
+
+
+# ---------------- Generator ----------------
+def generate(engine, users: int, requests_per_user: float = 4, notifications_per_user: float = 20,
+             photo_pool_size: int = 200, batch_size: int = 2000, seed: int = 0, verbose: bool = True) -> dict:
+    """
+    Append `users` residents with their requests and notifications, one
+    transaction per batch (an interrupted run keeps whole batches). Returns the row counts.
+    """
+    rng = random.Random(seed)
+    photos = photo_pool(rng, photo_pool_size) if photo_pool_size else []
+    password = hash_password(SYNTHETIC_PASSWORD)
+    now = datetime.utcnow()
+    with engine.connect() as conn:
+        start = conn.execute(select(func.max(UserDB.id))).scalar() or 0
+    totals = {"users": 0, "document_requests": 0, "notifications": 0}
+    began = time.perf_counter()
+
+    for first in range(start + 1, start + users + 1, batch_size):
+        count = min(batch_size, start + users + 1 - first)
+        with engine.begin() as conn:
+            last_id = conn.execute(select(func.max(UserDB.id))).scalar() or 0
+            conn.execute(insert(UserDB), user_rows(rng, first, count, photos, password))
+            created = conn.execute(
+                select(UserDB.id, UserDB.contact).where(UserDB.id > last_id).order_by(UserDB.id)
+            ).all()
+            requests, notifications = activity_rows(rng, created, now, requests_per_user, notifications_per_user, photos)
+            if requests:
+                conn.execute(insert(DocumentRequestDB), requests)
+            if notifications:
+                conn.execute(insert(NotificationDB), notifications)
+
+        totals["users"] += count
+        totals["document_requests"] += len(requests)
+        totals["notifications"] += len(notifications)
+        if verbose:
+            rate = totals["users"] / (time.perf_counter() - began)
+            print(f"  … {totals['users']}/{users} users ({rate:,.0f}/s)", end="\r", flush=True)
+
+    with engine.begin() as conn:
+        for stmt in rebuild_stmts():
+            conn.execute(stmt)
+        conn.execute(text("ANALYZE"))
+    if verbose:
+        print()
+        print(f"✅ Generated {totals['users']} users, {totals['document_requests']} requests, "
+              f"{totals['notifications']} notifications, {len(photos)} photos")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append a synthetic barangay dataset to the database.")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--requests-per-user", type=float, default=4, help="mean; 500k users x 4 = 2M requests")
+    parser.add_argument("--notifications-per-user", type=float, default=20, help="mean; 500k users x 20 = 10M")
+    parser.add_argument("--photo-pool", type=int, default=200, help="distinct photo blobs (0 = no photos)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="residents per insert batch")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed (same arguments, same data)")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine, verbose=False)
+    generate(engine, args.users, args.requests_per_user, args.notifications_per_user,
+             args.photo_pool, args.batch_size, args.seed)